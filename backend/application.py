@@ -1,17 +1,36 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
-from src.database import connect_to_mongo, close_mongo_connection, connect_to_redis, close_redis_connection
+from concurrent.futures import ThreadPoolExecutor
+import asyncio
+import anyio.to_thread
+from src.database import connect_to_mongo, close_mongo_connection, connect_to_redis, close_redis_connection, create_indexes, backfill_itinerary_user_ids
 from src.api import auth, users, trips
+from src.agent.graph import init_checkpointer
+from src.auth.dependencies import load_bypass_user
+from src.agent.tools.amadeus_client import close_amadeus_client
+from src.agent.tools.cache import aseed_registered_emails
 from src.config import settings
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     # Startup
+    # Size both thread pools: anyio's (FastAPI sync deps/routes) and the loop's
+    # default executor (asyncio.to_thread, sync LangGraph nodes).
+    anyio.to_thread.current_default_thread_limiter().total_tokens = settings.THREADPOOL_SIZE
+    asyncio.get_running_loop().set_default_executor(
+        ThreadPoolExecutor(max_workers=settings.THREADPOOL_SIZE)
+    )
     await connect_to_mongo()
+    await create_indexes()
+    await load_bypass_user()
+    await backfill_itinerary_user_ids()
     await connect_to_redis()
+    await aseed_registered_emails()
+    await init_checkpointer()
     yield
     # Shutdown
+    await close_amadeus_client()
     await close_mongo_connection()
     await close_redis_connection()
 
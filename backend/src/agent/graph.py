@@ -1,25 +1,47 @@
 """LangGraph assembly – Human-in-the-Loop with Checkpointing.
 
-Uses interrupt_before pattern for two pause points:
-1. Before intent_slot (when looping for clarification)
-2. Before review (to show draft itinerary for approval)
+Two pause points:
+1. After intent_slot (when looping for clarification)
+2. After itinerary_gen (interrupt_after, to show draft itinerary for approval)
 
 Graph flow:
   initializer → intent_slot → (loop via interrupt | proceed)
-    → planner → itinerary_gen → review → (approve → finalizer | revise → planner)
+    → planner → itinerary_gen → [review] → (approve → finalizer | revise → planner)
     → finalizer → END
+
+There is no review node: the API records the user's decision with
+aupdate_state(..., as_node="itinerary_gen"), which re-evaluates
+_route_after_review on the updated state before the run resumes.
+
+Checkpoints live in Redis (AsyncRedisSaver on the app's Redis client) so
+paused sessions are shared across Uvicorn workers and expire after
+CHECKPOINT_TTL_MINUTES. They are only persisted when a run exits (interrupt
+or END) — see CHECKPOINT_DURABILITY. Those are the only states the API
+resumes from.
+
+The checkpointer is set up in the app lifespan by init_checkpointer(), after
+the Redis connection is up. The graph itself is compiled lazily on the first
+get_travel_graph() call, so startup (and health checks) never pay for it.
 """
 
+import functools
 from langgraph.graph import StateGraph, END
 from langgraph.checkpoint.memory import MemorySaver
+from langgraph.checkpoint.redis.aio import AsyncRedisSaver
+from src.config import settings
+from src.database import get_redis_client
 from src.agent.state import AgentState
 from src.agent.nodes.initializer import initializer_node
 from src.agent.nodes.intent_slot import intent_slot_node
 from src.agent.nodes.planner import planner_node
 from src.agent.nodes.itinerary_gen import itinerary_gen_node
-from src.agent.nodes.review import review_node
 from src.agent.nodes.finalizer import finalizer_node
 
+# Persist checkpoints only when a run exits (at the review interrupt, after
+# intent_slot asks for clarification, or at END) instead of after every node.
+# Pass as `durability=` to every ainvoke/astream on travel_graph.
+CHECKPOINT_DURABILITY = "exit"
+
 
 def _route_after_intent_slot(state: dict) -> str:
     """
@@ -36,7 +58,7 @@ def _route_after_intent_slot(state: dict) -> str:
 
 def _route_after_review(state: dict) -> str:
     """
-    After review:
+    After the user reviews the draft from itinerary_gen:
     - If approved → finalizer
     - If revision requested → back to planner
     """
@@ -45,8 +67,11 @@ def _route_after_review(state: dict) -> str:
     return "planner"
 
 
-def build_travel_graph():
-    """Build and compile the LangGraph travel planning graph with checkpointing."""
+def build_travel_graph(checkpointer=None):
+    """Build and compile the LangGraph travel planning graph with checkpointing.
+    
+    Falls back to an in-process MemorySaver when no checkpointer is given.
+    """
     
     graph = StateGraph(AgentState)
     
@@ -55,7 +80,6 @@ def build_travel_graph():
     graph.add_node("intent_slot", intent_slot_node)
     graph.add_node("planner", planner_node)
     graph.add_node("itinerary_gen", itinerary_gen_node)
-    graph.add_node("review", review_node)
     graph.add_node("finalizer", finalizer_node)
     
     # Set entry point
@@ -75,11 +99,10 @@ def build_travel_graph():
     )
     
     graph.add_edge("planner", "itinerary_gen")
-    graph.add_edge("itinerary_gen", "review")
     
-    # review → finalizer (approved) or → planner (revision)
+    # itinerary_gen → (user review) → finalizer (approved) or → planner (revision)
     graph.add_conditional_edges(
-        "review",
+        "itinerary_gen",
         _route_after_review,
         {
             "finalizer": "finalizer",
@@ -89,13 +112,55 @@ def build_travel_graph():
     
     graph.add_edge("finalizer", END)
     
-    # Compile with checkpointer + interrupt before review node
-    checkpointer = MemorySaver()
+    # Compile with checkpointer + interrupt after itinerary generation
     return graph.compile(
-        checkpointer=checkpointer,
-        interrupt_before=["review"]  # Pause before review to show draft itinerary
+        checkpointer=checkpointer or MemorySaver(),
+        interrupt_after=["itinerary_gen"]  # Pause to show draft itinerary for review
     )
 
 
-# Pre-compiled graph instance
-travel_graph = build_travel_graph()
+# Set by init_checkpointer() during app startup
+_checkpointer = None
+
+
+async def init_checkpointer():
+    """Create the Redis checkpointer the travel graph compiles against.
+    
+    Must run after connect_to_redis(). If Redis can't host the checkpoint
+    indexes (needs the RedisJSON + RediSearch modules), falls back to an
+    in-memory saver so local development still works.
+    """
+    global _checkpointer
+    
+    try:
+        saver = AsyncRedisSaver(
+            redis_client=get_redis_client(),
+            ttl={"default_ttl": settings.CHECKPOINT_TTL_MINUTES, "refresh_on_read": True},
+        )
+        await saver.asetup()
+        print("Using Redis checkpointer for the travel graph")
+    except Exception as e:
+        print(f"Redis checkpointer unavailable ({e}); falling back to in-memory checkpoints")
+        saver = MemorySaver()
+    
+    _checkpointer = saver
+
+
+def get_checkpointer():
+    """The graph's checkpointer.
+    
+    Exposed so the API can read thread state with a cheap aget_tuple()
+    instead of the full travel_graph.aget_state() rehydration.
+    """
+    if _checkpointer is None:
+        raise RuntimeError("Checkpointer not initialized — init_checkpointer() runs at app startup")
+    return _checkpointer
+
+
+@functools.lru_cache(maxsize=1)
+def get_travel_graph():
+    """The compiled travel graph, built on first use.
+    
+    Tests that swap the checkpointer should call get_travel_graph.cache_clear().
+    """
+    return build_travel_graph(get_checkpointer())
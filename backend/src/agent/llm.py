@@ -0,0 +1,25 @@
+"""Shared helpers for the Gemini-backed nodes.
+
+Every node's ChatGoogleGenerativeAI gets GEMINI_CLIENT_ARGS as `client_args`;
+google-genai passes them straight to the httpx clients it builds. Since the
+nodes cache their LLM instance, each one keeps a single HTTP/2 keep-alive
+pool to Gemini instead of paying TCP + TLS setup per call.
+
+prompt_json() is how every node serializes state into its prompts.
+"""
+
+import httpx
+import orjson
+
+GEMINI_CLIENT_ARGS = {
+    "http2": True,
+    "limits": httpx.Limits(max_connections=50, max_keepalive_connections=20),
+}
+
+
+def prompt_json(obj) -> str:
+    """Compact JSON for prompts — indentation only costs tokens.
+    
+    orjson; datetimes are native, other unknown types go through str.
+    """
+    return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS, default=str).decode()
@@ -2,9 +2,15 @@
 
 No LLM. Saves the trip and itinerary version to MongoDB.
 Handles versioning of itinerary.
+
+Conversation messages are stored one document per message in
+`conversation_messages` (ordered by `seq`), next to a small header document
+in `conversations`, so the log never becomes one ever-growing array.
 """
 
+import asyncio
 from datetime import datetime
+from pymongo import WriteConcern
 from src.database import get_database
 
 
@@ -42,10 +48,7 @@ async def finalizer_node(state: dict) -> dict:
         "final_itinerary_version": None
     }
     
-    trip_result = await db.trips.insert_one(trip_doc)
-    trip_id = str(trip_result.inserted_id)
-    
-    # ── Save Itinerary Version ──
+    # ── Build Itinerary Version ──
     # Transform itinerary days to match the ItineraryVersion schema
     days_data = []
     for day in itinerary.get("days", []):
@@ -71,7 +74,8 @@ async def finalizer_node(state: dict) -> dict:
         })
     
     version_doc = {
-        "trip_id": trip_id,
+        "trip_id": None,  # filled in once the trip insert returns
+        "user_id": user_id,
         "version_number": 1,
         "created_at": now,
         "created_by": "ai",
@@ -83,25 +87,54 @@ async def finalizer_node(state: dict) -> dict:
         }
     }
     
-    version_result = await db.itinerary_versions.insert_one(version_doc)
-    version_id = str(version_result.inserted_id)
-    
-    # ── Save Conversation ──
+    # ── Build Conversation ──
     messages = state.get("messages", [])
+    # Normalize to (role, content) with a single type check per message;
+    # a single pass (rather than partitioning by type) keeps message order.
+    message_pairs = [
+        (msg.get("role", "ai"), msg.get("content", "")) if isinstance(msg, dict) else ("ai", str(msg))
+        for msg in messages
+    ]
     conversation_doc = {
-        "trip_id": trip_id,
+        "trip_id": None,
         "user_id": user_id,
         "created_at": now,
-        "messages": [
-            {
-                "role": msg.get("role", "ai") if isinstance(msg, dict) else "ai",
-                "content": msg.get("content", "") if isinstance(msg, dict) else str(msg),
-                "timestamp": now,
-            }
-            for msg in messages
-        ]
+        "message_count": len(message_pairs),
     }
-    await db.conversations.insert_one(conversation_doc)
+    
+    # ── Save ──
+    # All docs are built up front; only the trip insert has to complete first
+    # since the others reference its ID. The rest are issued concurrently.
+    # GET /trips/{id}/conversations reads the messages back, so they are
+    # acknowledged like the rest. Only the small header is written
+    # unacknowledged (w=0): it just carries trip/user IDs and a count.
+    trip_result = await db.trips.insert_one(trip_doc)
+    trip_id = str(trip_result.inserted_id)
+    version_doc["trip_id"] = trip_id
+    conversation_doc["trip_id"] = trip_id
+    
+    message_docs = [
+        {
+            "trip_id": trip_id,
+            "user_id": user_id,
+            "seq": seq,
+            "role": role,
+            "content": content,
+            "timestamp": now,
+        }
+        for seq, (role, content) in enumerate(message_pairs)
+    ]
+    
+    unacked = WriteConcern(w=0)
+    writes = [
+        db.itinerary_versions.insert_one(version_doc),
+        db.conversations.with_options(write_concern=unacked).insert_one(conversation_doc),
+    ]
+    if message_docs:
+        writes.append(db.conversation_messages.insert_many(message_docs, ordered=False))
+    
+    version_result, *_ = await asyncio.gather(*writes)
+    version_id = str(version_result.inserted_id)
     
     return {
         "trip_id": trip_id,
@@ -1,10 +1,13 @@
 """Node 0: Pre-Agent Initializer – No LLM.
 
-Loads user preferences and saved constraints from MongoDB,
-attaches all context to the initial agent state.
+Loads user preferences and saved constraints from MongoDB (through a
+Redis read-through cache), attaches all context to the initial agent state.
 """
 
+from bson import ObjectId
+from bson.errors import InvalidId
 from src.database import get_database
+from src.agent.tools.cache import aget_user_prefs, aset_user_prefs
 
 
 async def initializer_node(state: dict) -> dict:
@@ -18,13 +21,24 @@ async def initializer_node(state: dict) -> dict:
     user_preferences = {}
     
     if user_id:
-        from bson import ObjectId
         try:
-            user = await db.users.find_one({"_id": ObjectId(user_id)})
-            if user and "preferences" in user:
-                user_preferences = user["preferences"]
-        except Exception:
-            pass  # If user not found, proceed with empty preferences
+            user_oid = ObjectId(user_id)
+        except (InvalidId, TypeError):
+            user_oid = None  # Malformed ID — don't bother asking Mongo
+        
+        if user_oid is not None:
+            cached = await aget_user_prefs(user_id)
+            if cached is not None:
+                user_preferences = cached
+            else:
+                # Only the preferences are needed — don't ship the whole user doc
+                user = await db.users.find_one(
+                    {"_id": user_oid},
+                    projection={"preferences": 1, "_id": 0}
+                )
+                if user:
+                    user_preferences = user.get("preferences", {})
+                    await aset_user_prefs(user_id, user_preferences)
     
     return {
         "user_preferences": user_preferences,
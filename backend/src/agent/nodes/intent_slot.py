@@ -5,15 +5,27 @@ Graph pauses BEFORE this node on clarification loops (via interrupt_before).
 The API layer handles injecting the user's response into state before resuming.
 """
 
+import re
 import json
+import functools
+import orjson
 from datetime import datetime, timedelta
 from langchain_google_genai import ChatGoogleGenerativeAI
 from langchain_core.messages import SystemMessage, HumanMessage
 from src.config import settings
+from src.agent.llm import GEMINI_CLIENT_ARGS, prompt_json
 from src.agent.schemas import SlotFillingResponse
 
 MAX_CLARIFICATION_ROUNDS = 3
 
+# Slots that _merge_with_preferences can fill from the user's profile
+_PREFERENCE_BACKED_SLOTS = ("budget_max", "interests", "travel_group")
+
+# Static — computed once at import instead of per call
+_FENCE_RE = re.compile(r"```(?:json)?\s*(.*?)```", re.S)
+# The schema is the one prompt JSON kept indented, to help the model follow it
+_SLOT_SCHEMA_STR = json.dumps(SlotFillingResponse.model_json_schema(), indent=2)
+
 SLOT_FILLING_SYSTEM_PROMPT = """You are a travel planning assistant for Voyage AI. Your ONLY job is to extract structured trip requirements from the user's message.
 
 Required information (slots):
@@ -49,12 +61,17 @@ Respond with a JSON object matching this exact schema:
 {schema}
 """
 
+# Schema never changes, so inject it once; only preferences vary per call.
+_SYSTEM_PROMPT_WITH_SCHEMA = SLOT_FILLING_SYSTEM_PROMPT.replace("{schema}", _SLOT_SCHEMA_STR)
+
 
+@functools.lru_cache(maxsize=1)
 def _get_llm():
     return ChatGoogleGenerativeAI(
         model=settings.LLM_MODEL,
         google_api_key=settings.GOOGLE_API_KEY,
         temperature=0.1,
+        client_args=GEMINI_CLIENT_ARGS,
     )
 
 
@@ -150,16 +167,15 @@ async def intent_slot_node(state: dict) -> dict:
     
     llm = _get_llm()
     
-    schema_str = json.dumps(SlotFillingResponse.model_json_schema(), indent=2)
-    system_prompt = SLOT_FILLING_SYSTEM_PROMPT.format(
-        user_preferences=json.dumps(user_preferences, indent=2, default=str),
-        schema=schema_str
+    system_prompt = _SYSTEM_PROMPT_WITH_SCHEMA.replace(
+        "{user_preferences}",
+        prompt_json(user_preferences)
     )
     
     # Include existing slots context if we're in a clarification loop
     context = ""
     if existing_slots:
-        context = f"\n\nSlots already collected:\n{json.dumps(existing_slots, indent=2, default=str)}\n\nPlease update/merge with any new information from the user's latest message."
+        context = f"\n\nSlots already collected:\n{prompt_json(existing_slots)}\n\nPlease update/merge with any new information from the user's latest message."
     
     llm_messages = [
         SystemMessage(content=system_prompt + context),
@@ -171,25 +187,26 @@ async def intent_slot_node(state: dict) -> dict:
     # Parse response
     try:
         response_text = response.content
-        if "```json" in response_text:
-            response_text = response_text.split("```json")[1].split("```")[0].strip()
-        elif "```" in response_text:
-            response_text = response_text.split("```")[1].split("```")[0].strip()
+        match = _FENCE_RE.search(response_text)
+        payload = match.group(1) if match else response_text
         
-        parsed = json.loads(response_text)
-        slot_response = SlotFillingResponse(**parsed)
+        parsed = orjson.loads(payload)
+        # Existing slots act as defaults; only non-empty new values override them,
+        # so one validation pass both checks and merges.
+        new_values = {k: v for k, v in parsed.items() if v}
+        slot_response = SlotFillingResponse.model_validate({**existing_slots, **new_values})
     except (json.JSONDecodeError, Exception):
-        slot_response = SlotFillingResponse(
-            follow_up_question="I had trouble understanding that. Could you tell me where you'd like to go and for how long?",
-            is_complete=False
-        )
+        slot_response = SlotFillingResponse.model_validate({
+            **existing_slots,
+            "follow_up_question": "I had trouble understanding that. Could you tell me where you'd like to go and for how long?",
+            "is_complete": False,
+        })
     
-    # Merge new slots with existing
-    new_slots = slot_response.dict(exclude={"follow_up_question", "is_complete"}, exclude_none=True)
-    merged_slots = {**existing_slots, **{k: v for k, v in new_slots.items() if v}}
+    merged_slots = slot_response.model_dump(exclude={"follow_up_question", "is_complete"}, exclude_none=True)
     
-    # Try filling from preferences
-    merged_slots = _merge_with_preferences(merged_slots, user_preferences)
+    # Try filling from preferences — only needed if one of the fields they cover is missing
+    if not all(merged_slots.get(field) for field in _PREFERENCE_BACKED_SLOTS):
+        merged_slots = _merge_with_preferences(merged_slots, user_preferences)
     
     # Check completeness
     is_complete = _check_completeness(merged_slots)
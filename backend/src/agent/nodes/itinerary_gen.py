@@ -2,25 +2,35 @@
 
 Converts strategy + insights into a clear, day-wise itinerary.
 Single LLM call. No new reasoning, no tool calls.
+
+The call is streamed, so the tokens surface through the graph's "messages"
+stream mode (see POST /trips/chat/stream) while the itinerary is still
+being generated. The JSON is parsed once the stream ends.
 """
 
+import re
 import json
+import functools
+import orjson
 from langchain_google_genai import ChatGoogleGenerativeAI
 from langchain_core.messages import SystemMessage, HumanMessage
 from src.config import settings
+from src.agent.llm import GEMINI_CLIENT_ARGS, prompt_json
 from src.agent.schemas import GeneratedItinerary
 
+# Static — computed once at import instead of per call
+_FENCE_RE = re.compile(r"```(?:json)?\s*(.*?)```", re.S)
+# The schema is the one prompt JSON kept indented, to help the model follow it
+_ITIN_SCHEMA_STR = json.dumps(GeneratedItinerary.model_json_schema(), indent=2)
+
 
 ITINERARY_SYSTEM_PROMPT = """You are an itinerary formatter for Voyage AI. Convert the travel strategy and insights into a beautiful, structured day-by-day itinerary.
 
 Trip Requirements:
 {trip_request}
 
-Travel Strategy:
-{strategy}
-
-Travel Insights:
-{insights}
+Travel Strategy & Insights:
+{strategy_and_insights}
 
 Tool Results (real data):
 {tool_results}
@@ -40,11 +50,13 @@ Respond with JSON matching this schema:
 """
 
 
+@functools.lru_cache(maxsize=1)
 def _get_llm():
     return ChatGoogleGenerativeAI(
         model=settings.LLM_MODEL,
         google_api_key=settings.GOOGLE_API_KEY,
         temperature=0.3,
+        client_args=GEMINI_CLIENT_ARGS,
     )
 
 
@@ -59,29 +71,27 @@ async def itinerary_gen_node(state: dict) -> dict:
     
     llm = _get_llm()
     
-    schema_str = json.dumps(GeneratedItinerary.model_json_schema(), indent=2)
     prompt = ITINERARY_SYSTEM_PROMPT.format(
-        trip_request=json.dumps(trip_request, indent=2, default=str),
-        strategy=json.dumps(trip_strategy, indent=2, default=str),
-        insights=json.dumps(trip_strategy, indent=2, default=str),
-        tool_results=json.dumps(tool_results, indent=2, default=str),
-        schema=schema_str
+        trip_request=prompt_json(trip_request),
+        strategy_and_insights=prompt_json(trip_strategy),
+        tool_results=prompt_json(tool_results),
+        schema=_ITIN_SCHEMA_STR
     )
     
-    response = await llm.ainvoke([
+    chunks = []
+    async for chunk in llm.astream([
         SystemMessage(content=prompt),
         HumanMessage(content="Generate the day-by-day itinerary.")
-    ])
+    ]):
+        chunks.append(chunk.text)
     
     # Parse response
     try:
-        response_text = response.content
-        if "```json" in response_text:
-            response_text = response_text.split("```json")[1].split("```")[0].strip()
-        elif "```" in response_text:
-            response_text = response_text.split("```")[1].split("```")[0].strip()
+        response_text = "".join(chunks)
+        match = _FENCE_RE.search(response_text)
+        payload = match.group(1) if match else response_text
         
-        itinerary_data = json.loads(response_text)
+        itinerary_data = orjson.loads(payload)
         itinerary = GeneratedItinerary(**itinerary_data)
     except Exception as e:
         # Fallback: minimal itinerary
@@ -95,8 +105,8 @@ async def itinerary_gen_node(state: dict) -> dict:
         )
     
     return {
-        "itinerary": itinerary.dict(),
-        "current_node": "finalizer",
+        "itinerary": itinerary.model_dump(),
+        "current_node": "review",  # graph pauses here for review (see graph.py)
         "messages": [{
             "role": "ai",
             "content": f"Your itinerary for {itinerary.title} is ready! Total estimated cost: {itinerary.currency} {itinerary.total_cost_estimate:.0f}."
@@ -13,21 +13,66 @@ When the loop ends, the accumulated strategy + all tool results are
 written to state for the itinerary generator node.
 """
 
-import json
+import asyncio
+import inspect
+import logging
+import functools
+import orjson
+import xxhash
+from typing import Optional
+from collections import defaultdict
 from langchain_google_genai import ChatGoogleGenerativeAI
 from langchain_core.messages import SystemMessage, HumanMessage, AIMessage
+from langchain_core.utils.json import parse_partial_json
+from pydantic import ValidationError
 from src.config import settings
-from src.agent.schemas import PlannerLLMResponse
-from src.agent.tools.flights import search_flights
-from src.agent.tools.hotels import search_hotels
+from src.agent.llm import GEMINI_CLIENT_ARGS, prompt_json
+from src.agent.schemas import PlannerLLMResponse, ToolRequest
+from src.agent.tools.flights import asearch_flights, afetch_flights
+from src.agent.tools.hotels import asearch_hotels, afetch_hotels
+from src.agent.tools.cache import (
+    aget_cached_many, aset_cached_many,
+    FLIGHT_CACHE_PREFIX, FLIGHT_CACHE_TTL, HOTEL_CACHE_PREFIX, HOTEL_CACHE_TTL,
+)
+
+logger = logging.getLogger(__name__)
 
 MAX_TOOL_ROUNDS = 10
+# Stop early after this many consecutive rounds in which every tool failed
+MAX_ERROR_ROUNDS = 2
+# Offers/hotels per tool result shown to the LLM (full results stay in state)
+COMPACT_TOP_K = 5
+# Rendered base system prompts kept in process (see _base_system_prompt)
+BASE_PROMPT_CACHE_SIZE = 256
+# Planner rounds (AI reply + feedback) kept verbatim in the LLM context;
+# older rounds are folded into a single "context so far" summary
+HISTORY_ROUNDS = 2
 
 # ── Tool registry — only whitelisted tools can be executed ──
 TOOL_REGISTRY = {
-    "search_flights": search_flights,
-    "search_hotels": search_hotels,
+    "search_flights": asearch_flights,
+    "search_hotels": asearch_hotels,
+}
+
+# Tools whose cache the planner handles itself, so one tool round costs a
+# single pipelined Redis lookup: tool_name -> (uncached fetch, cache prefix, TTL)
+_CACHED_TOOLS = {
+    "search_flights": (afetch_flights, FLIGHT_CACHE_PREFIX, FLIGHT_CACHE_TTL),
+    "search_hotels": (afetch_hotels, HOTEL_CACHE_PREFIX, HOTEL_CACHE_TTL),
 }
+# Used to validate LLM-supplied parameters and fill in defaults, so cache
+# keys match the ones the tools build themselves
+_CACHED_TOOL_SIGNATURES = {name: inspect.signature(spec[0]) for name, spec in _CACHED_TOOLS.items()}
+
+# xxh3 of (trip_request, user_preferences) -> rendered base system prompt
+_base_prompts: dict = {}
+
+# Static — computed once at import instead of on every planner entry.
+# Sent as Gemini's response schema, so it is not repeated in the prompt
+_PLANNER_SCHEMA = PlannerLLMResponse.model_json_schema()
+# Response fields generated before tool_requests is complete; seeing any other
+# field in the partial JSON means every tool request has been emitted
+_TOOL_PHASE_FIELDS = frozenset({"stop", "reasoning", "tool_requests"})
 
 PLANNER_SYSTEM_PROMPT = """You are the travel planner for Voyage AI. You plan trips by iteratively gathering data through tools.
 
@@ -69,24 +114,209 @@ You are in an iterative loop. Each round you respond with a JSON object:
 - Be specific and realistic with cost estimates.
 - Do NOT generate the day-by-day itinerary — that's the next node's job.
 - For attractions, restaurants, and local info, use your built-in knowledge.
-
-## Response Schema (JSON)
-{schema}
 """
 
 
+# Trip-independent part of the strategy used when the LLM never produced a
+# valid response; planner_node fills in the trip-specific fields.
+# Treat as read-only — model_copy() is shallow.
+_FALLBACK_STRATEGY = PlannerLLMResponse(
+    stop=True,
+    key_experiences=["Local food", "Cultural sites", "City exploration"],
+    budget_allocation={"flights": 30, "hotels": 35, "activities": 20, "food": 10, "misc": 5},
+    recommendations=["Explore local food markets", "Visit cultural landmarks"],
+)
+
+
+def _tool_requests_signature(tool_requests: list) -> str:
+    """Order-independent fingerprint of one round's tool requests."""
+    canonical = sorted(orjson.dumps(r, option=orjson.OPT_SORT_KEYS, default=str) for r in tool_requests)
+    return xxhash.xxh3_64_hexdigest(b"\n".join(canonical))
+
+
+def _prompt_cache_key(trip_request: dict, user_preferences: dict) -> str:
+    """Key for a rendered base system prompt in _base_prompts."""
+    raw = orjson.dumps(
+        [trip_request, user_preferences],
+        option=orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS,
+        default=str,
+    )
+    return xxhash.xxh3_64_hexdigest(raw)
+
+
+def _base_system_prompt(trip_request: dict, user_preferences: dict) -> str:
+    """PLANNER_SYSTEM_PROMPT rendered for this trip, cached in process.
+    
+    Kept out of graph state so the rendered text isn't written into every
+    checkpoint. Oldest entries are evicted first.
+    """
+    key = _prompt_cache_key(trip_request, user_preferences)
+    prompt = _base_prompts.get(key)
+    if prompt is None:
+        prompt = PLANNER_SYSTEM_PROMPT.format(
+            trip_request=prompt_json(trip_request),
+            user_preferences=prompt_json(user_preferences),
+            max_rounds=MAX_TOOL_ROUNDS,
+        )
+        if len(_base_prompts) >= BASE_PROMPT_CACHE_SIZE:
+            del _base_prompts[next(iter(_base_prompts))]
+        _base_prompts[key] = prompt
+    return prompt
+
+
+@functools.lru_cache(maxsize=1)
 def _get_llm():
-    """Get the Gemini LLM instance."""
-    return ChatGoogleGenerativeAI(
+    """Get the Gemini LLM instance (built once, shared across runs).
+    
+    Bound to PlannerLLMResponse's JSON schema, so Gemini only emits JSON
+    matching it. Validation happens in _stream_planner_turn — the output is
+    streamed rather than parsed in one go by with_structured_output().
+    """
+    llm = ChatGoogleGenerativeAI(
         model=settings.LLM_MODEL,
         google_api_key=settings.GOOGLE_API_KEY,
         temperature=0.2,
+        client_args=GEMINI_CLIENT_ARGS,
     )
+    return llm.bind(response_mime_type="application/json", response_json_schema=_PLANNER_SCHEMA)
+
+
+def _compact_flights(result: dict) -> dict:
+    """Just the fields the planner reasons about: price, carrier, duration, stops."""
+    flights = []
+    for flight in result.get("flights", [])[:COMPACT_TOP_K]:
+        legs = flight.get("itineraries", [])
+        flights.append({
+            "price": flight.get("price_total"),
+            "currency": flight.get("price_currency"),
+            "carriers": sorted({seg.get("carrier", "") for leg in legs for seg in leg.get("segments", [])}),
+            "durations": [leg.get("duration", "") for leg in legs],
+            "stops": [leg.get("stops", 0) for leg in legs],
+        })
+    return {"flights": flights, "total_results": result.get("total_results", len(flights))}
+
+
+def _compact_hotels(result: dict) -> dict:
+    """Hotel name, location and its first offer's price."""
+    hotels = []
+    for hotel in result.get("hotels", [])[:COMPACT_TOP_K]:
+        offer = (hotel.get("offers") or [{}])[0]
+        hotels.append({
+            "name": hotel.get("name"),
+            "latitude": hotel.get("latitude"),
+            "longitude": hotel.get("longitude"),
+            "price_per_night": offer.get("price_per_night"),
+            "price_total": offer.get("price_total"),
+            "currency": offer.get("price_currency"),
+            "room_type": offer.get("room_type"),
+        })
+    return {"hotels": hotels, "total_results": result.get("total_results", len(hotels))}
+
+
+_RESULT_COMPACTORS = {
+    "search_flights": _compact_flights,
+    "search_hotels": _compact_hotels,
+}
+
+
+def _compact_result(tool_name: str, result) -> dict:
+    """Trim a tool result for the LLM feedback message; errors pass through as-is."""
+    compact = _RESULT_COMPACTORS.get(tool_name)
+    if compact is None or not isinstance(result, dict) or "error" in result:
+        return result
+    return compact(result)
+
+
+def _trim_history(head: list, loop_messages: list, all_tool_calls: list, gathered: dict) -> list:
+    """Keep the opening messages + the last HISTORY_ROUNDS rounds of the loop.
+    
+    Everything in between is replaced by one SystemMessage listing the tools
+    called so far and the (compacted) data gathered, so the prompt stays
+    roughly the same size instead of growing every round.
+    """
+    recent = loop_messages[-2 * HISTORY_ROUNDS:]
+    if len(loop_messages) <= len(head) + len(recent):
+        return loop_messages
+    
+    summary = SystemMessage(content=(
+        f"Context so far (earlier rounds, condensed):\n"
+        f"Tools called: {[r.get('tool_name', '') for r in all_tool_calls]}\n"
+        f"Data gathered:\n{prompt_json(gathered)}"
+    ))
+    # The opening HumanMessage stays so the turns still alternate user/model
+    return [head[0], summary, *head[1:], *recent]
+
+
+def _start_speculative_tools(trip_request: dict) -> dict:
+    """Kick off the flight + hotel searches the planner almost always asks for first.
+    
+    Uses the same parameters the system prompt tells the LLM to use, so its
+    first tool round can usually pick up results that are already in flight.
+    Returns {tool_name: (params, task)}; empty if required slots are missing.
+    """
+    origin = trip_request.get("origin_iata")
+    destination = trip_request.get("destination_iata")
+    start_date = trip_request.get("start_date")
+    if not (origin and destination and start_date):
+        return {}
+    
+    end_date = trip_request.get("end_date")
+    travelers = trip_request.get("traveler_count") or 1
+    planned = {
+        "search_flights": {
+            "origin": origin, "destination": destination,
+            "departure_date": start_date, "return_date": end_date,
+            "travelers": travelers,
+        },
+        "search_hotels": {
+            "city_code": destination, "checkin": start_date,
+            "checkout": end_date, "guests": travelers,
+        },
+    }
+    return {
+        tool_name: (params, asyncio.create_task(TOOL_REGISTRY[tool_name](**params)))
+        for tool_name, params in planned.items()
+    }
+
+
+def _cancel_speculative(speculative: dict) -> None:
+    """Cancel any speculative tool calls nobody picked up."""
+    for _, task in speculative.values():
+        task.cancel()
+    speculative.clear()
+
+
+def _bind_params(tool_name: str, params: dict) -> dict:
+    """A cached tool's parameters with its defaults filled in.
+    
+    Raises TypeError if they don't fit the tool's signature.
+    """
+    bound = _CACHED_TOOL_SIGNATURES[tool_name].bind(**params)
+    bound.apply_defaults()
+    return bound.arguments
 
 
-def _execute_tools(tool_requests: list) -> dict:
-    """Deterministic tool execution — only whitelisted tools allowed."""
+def _same_params(tool_name: str, a: dict, b: dict) -> bool:
+    """Compare two calls' parameters once defaults are applied to both."""
+    try:
+        return _bind_params(tool_name, a) == _bind_params(tool_name, b)
+    except TypeError:
+        return False
+
+
+async def _execute_tools_async(tool_requests: list, speculative: Optional[dict] = None) -> dict:
+    """Deterministic tool execution — only whitelisted tools allowed.
+    
+    Tools are async, so all of a round's requests run concurrently. A request
+    matching a speculative call (see _start_speculative_tools) reuses its task
+    instead of calling the tool again. Cache lookups and writes for the
+    round's cacheable tools are each batched into one Redis round-trip.
+    """
+    speculative = speculative if speculative is not None else {}
     results = {}
+    names = []
+    calls = []
+    cacheable = []  # (tool_name, bound args) still to look up in the cache
     for req in tool_requests:
         tool_name = req.get("tool_name", "")
         params = req.get("parameters", {})
@@ -95,27 +325,100 @@ def _execute_tools(tool_requests: list) -> dict:
             results[tool_name] = {"error": f"Unknown tool: {tool_name}"}
             continue
         
+        if tool_name in speculative and _same_params(tool_name, speculative[tool_name][0], params):
+            calls.append(speculative.pop(tool_name)[1])
+            names.append(tool_name)
+            continue
+        
         try:
-            tool_fn = TOOL_REGISTRY[tool_name]
-            result = tool_fn(**params)
-            results[tool_name] = result
+            if tool_name in _CACHED_TOOLS:
+                cacheable.append((tool_name, _bind_params(tool_name, params)))
+                continue
+            calls.append(TOOL_REGISTRY[tool_name](**params))
         except Exception as e:
+            # Bad parameters fail at call time, before there's a coroutine to await
             results[tool_name] = {"error": str(e)}
+            continue
+        names.append(tool_name)
+    
+    # ── Cache lookup (one round-trip) — only misses hit the external APIs ──
+    hits = await aget_cached_many([(_CACHED_TOOLS[name][1], args) for name, args in cacheable])
+    to_store = {}  # index in calls -> (tool_name, args)
+    for (tool_name, args), hit in zip(cacheable, hits):
+        if hit:
+            hit["_cached"] = True
+            results[tool_name] = hit
+            continue
+        to_store[len(calls)] = (tool_name, args)
+        calls.append(_CACHED_TOOLS[tool_name][0](**args))
+        names.append(tool_name)
+    
+    outcomes = await asyncio.gather(*calls, return_exceptions=True)
+    for tool_name, outcome in zip(names, outcomes):
+        if isinstance(outcome, Exception):
+            outcome = {"error": str(outcome)}
+        results[tool_name] = outcome
+    
+    # ── Cache fresh results (one round-trip; errors are not cached) ──
+    entries = []
+    for index, (tool_name, args) in to_store.items():
+        outcome = outcomes[index]
+        if isinstance(outcome, dict) and "error" not in outcome:
+            _, prefix, ttl = _CACHED_TOOLS[tool_name]
+            entries.append((prefix, outcome, ttl, args))
+    await aset_cached_many(entries)
     
     return results
 
 
-def _parse_llm_response(response_text: str) -> PlannerLLMResponse:
-    """Parse LLM response text into PlannerLLMResponse."""
-    # Strip markdown code fences if present
-    text = response_text.strip()
-    if "```json" in text:
-        text = text.split("```json")[1].split("```")[0].strip()
-    elif "```" in text:
-        text = text.split("```")[1].split("```")[0].strip()
+async def _stream_planner_turn(llm, messages: list, speculative: dict) -> tuple:
+    """Run one planner LLM turn, dispatching tools while it's still generating.
     
-    data = json.loads(text)
-    return PlannerLLMResponse(**data)
+    tool_requests comes early in the response, so once the partial JSON shows
+    every request has been emitted, they are started as one batched
+    _execute_tools_async call (one Redis round-trip), overlapping tool I/O
+    with the rest of the generation (reasoning about strategy, costs, ...).
+    
+    Returns (PlannerLLMResponse, task, count): task is the dispatched call for
+    the first count tool requests, or None if the stream didn't get that far.
+    If the response fails to validate, the task is cancelled and the error
+    propagates.
+    """
+    buffer = ""
+    early_task, early_count = None, 0
+    dispatched = False
+    try:
+        async for chunk in llm.astream(messages):
+            buffer += chunk.text
+            if dispatched:
+                continue
+            try:
+                partial = parse_partial_json(buffer)
+            except ValueError:
+                continue
+            if not isinstance(partial, dict) or not isinstance(partial.get("tool_requests"), list):
+                continue
+            # Until a later field shows up, the last request may still be mid-generation
+            if not partial.keys() - _TOOL_PHASE_FIELDS:
+                continue
+            
+            dispatched = True
+            early_requests = []
+            for req in partial["tool_requests"]:
+                try:
+                    early_requests.append(ToolRequest.model_validate(req).model_dump())
+                except ValidationError:
+                    # Left to the post-stream call, after the full response validates
+                    break
+            if early_requests:
+                early_task = asyncio.create_task(_execute_tools_async(early_requests, speculative))
+                early_count = len(early_requests)
+        
+        return PlannerLLMResponse.model_validate_json(buffer), early_task, early_count
+    except BaseException:
+        if early_task:
+            early_task.cancel()
+        raise
 
 
 async def planner_node(state: dict) -> dict:
@@ -138,14 +441,10 @@ async def planner_node(state: dict) -> dict:
     previous_itinerary = state.get("itinerary", {})
     
     llm = _get_llm()
-    schema_str = json.dumps(PlannerLLMResponse.model_json_schema(), indent=2)
     
-    system_prompt = PLANNER_SYSTEM_PROMPT.format(
-        trip_request=json.dumps(trip_request, indent=2, default=str),
-        user_preferences=json.dumps(user_preferences, indent=2, default=str),
-        max_rounds=MAX_TOOL_ROUNDS,
-        schema=schema_str
-    )
+    # Base prompt only depends on trip_request + user_preferences, so revision
+    # passes reuse the one rendered on the first pass (byte-identical prefix)
+    system_prompt = _base_system_prompt(trip_request, user_preferences)
     
     # If this is a revision pass, add context about what the user wants changed
     if review_feedback and previous_strategy:
@@ -157,124 +456,141 @@ The user reviewed the previous itinerary and requested changes.
 User's feedback: "{review_feedback}"
 
 Previous strategy:
-{json.dumps(previous_strategy, indent=2, default=str)}
+{prompt_json(previous_strategy)}
 
 Previous itinerary summary:
-{json.dumps(previous_itinerary.get('summary', ''), default=str)}
+{prompt_json(previous_itinerary.get('summary', ''))}
 
 IMPORTANT: Focus on addressing the user's feedback. You may call tools again if the feedback requires new data (e.g., different flights, hotels). Otherwise, update your strategy to reflect the requested changes and set stop=true.
 """
     
     # Conversation history for the planner loop (internal to this node)
-    loop_messages = [
+    head = [
         SystemMessage(content=system_prompt),
         HumanMessage(content="Begin planning. Decide which tools to call first.")
     ]
+    loop_messages = list(head)
     
-    all_tool_results = {}  # accumulated across all rounds
-    all_tool_calls = []    # log of every tool request
-    final_strategy = None  # the last PlannerLLMResponse with stop=true
+    all_tool_results = defaultdict(list)  # tool_name -> results, across all rounds
+    all_tool_calls = []                   # log of every tool request
+    gathered = {}                         # latest compact result per tool, for trimmed history
+    final_strategy = None                 # the last PlannerLLMResponse with stop=true
+    seen_tool_signatures = set()          # one per round's set of tool requests
+    consecutive_error_rounds = 0          # rounds in a row where every tool failed
     
-    for round_num in range(1, MAX_TOOL_ROUNDS + 1):
-        # ── LLM turn ──
-        response = await llm.ainvoke(loop_messages)
-        response_text = response.content
-        
-        # Parse the response
-        try:
-            planner_response = _parse_llm_response(response_text)
-        except (json.JSONDecodeError, Exception):
-            # If parsing fails on a non-final round, ask LLM to retry
-            if round_num < MAX_TOOL_ROUNDS:
-                loop_messages.append(AIMessage(content=response_text))
+    # On a fresh plan, start the usual first-round searches while the LLM thinks
+    speculative = {} if review_feedback else _start_speculative_tools(trip_request)
+    
+    try:
+        for round_num in range(1, MAX_TOOL_ROUNDS + 1):
+            # ── LLM turn (tools start as soon as they're requested) ──
+            try:
+                planner_response, early_task, early_count = await _stream_planner_turn(llm, loop_messages, speculative)
+            except (ValidationError, orjson.JSONDecodeError) as e:
+                # Response failed to validate against the schema — stop with whatever we have.
+                # Transport, auth and quota errors from Gemini propagate.
+                logger.warning("Planner round %d returned an invalid response: %s", round_num, e)
+                break
+            
+            # Add LLM response to conversation
+            loop_messages.append(AIMessage(content=planner_response.model_dump_json()))
+            
+            # ── Check stop flag ──
+            if planner_response.stop:
+                if early_task:
+                    early_task.cancel()
+                final_strategy = planner_response
+                break
+            
+            # ── Execute requested tools ──
+            tool_requests = [tr.model_dump() for tr in planner_response.tool_requests]
+            
+            if not tool_requests:
+                # LLM didn't request tools and didn't set stop — nudge it
                 loop_messages.append(HumanMessage(
-                    content="Your response was not valid JSON. Please respond with a valid JSON object matching the schema."
+                    content="You didn't request any tools and didn't set stop=true. Either call tools you need or set stop=true with your final strategy."
                 ))
                 continue
-            else:
-                # Last round — force stop with whatever we have
+            
+            # ── Convergence: the same tool calls again add no new information ──
+            signature = _tool_requests_signature(tool_requests)
+            if signature in seen_tool_signatures:
+                if early_task:
+                    early_task.cancel()
+                logger.info("Planner round %d repeated earlier tool calls; stopping", round_num)
+                final_strategy = planner_response
                 break
-        
-        # Add LLM response to conversation
-        loop_messages.append(AIMessage(content=response_text))
-        
-        # ── Check stop flag ──
-        if planner_response.stop:
-            final_strategy = planner_response
-            break
-        
-        # ── Execute requested tools ──
-        tool_requests = [tr.dict() if hasattr(tr, "dict") else tr for tr in planner_response.tool_requests]
-        
-        if not tool_requests:
-            # LLM didn't request tools and didn't set stop — nudge it
-            loop_messages.append(HumanMessage(
-                content="You didn't request any tools and didn't set stop=true. Either call tools you need or set stop=true with your final strategy."
-            ))
-            continue
-        
-        all_tool_calls.extend(tool_requests)
-        round_results = _execute_tools(tool_requests)
-        
-        # Merge into accumulated results (keyed by tool_name, later calls overwrite)
-        for tool_name, result in round_results.items():
-            if tool_name in all_tool_results:
-                # If same tool called again, store as list
-                if isinstance(all_tool_results[tool_name], list):
-                    all_tool_results[tool_name].append(result)
-                else:
-                    all_tool_results[tool_name] = [all_tool_results[tool_name], result]
-            else:
-                all_tool_results[tool_name] = result
-        
-        # ── Feed results back to LLM ──
-        tools_called = [r.get("tool_name", "") for r in tool_requests]
-        
-        # Check for errors in results
-        has_errors = any(
-            isinstance(v, dict) and "error" in v 
-            for v in round_results.values()
-        )
-        error_note = ""
-        if has_errors:
-            error_note = (
-                "\n\n⚠️ Some tools returned errors. Do NOT retry them. "
-                "Use your own knowledge to estimate costs and details for the failed tools. "
-                "Proceed with planning using whatever data you have."
+            seen_tool_signatures.add(signature)
+            
+            all_tool_calls.extend(tool_requests)
+            # Wait for the tools dispatched mid-stream, and run any the stream didn't cover
+            remaining = _execute_tools_async(tool_requests[early_count:], speculative)
+            pending = [early_task, remaining] if early_task else [remaining]
+            round_results = {}
+            for partial_results in await asyncio.gather(*pending):
+                round_results.update(partial_results)
+            _cancel_speculative(speculative)  # only the first tool round can use them
+            
+            # Accumulate results — every tool maps to the list of its results, in call order
+            for tool_name, result in round_results.items():
+                all_tool_results[tool_name].append(result)
+            
+            # ── Feed results back to LLM ──
+            # Only a compact projection goes into the prompt — raw Amadeus payloads
+            # are large and get re-sent on every later round.
+            tools_called = [r.get("tool_name", "") for r in tool_requests]
+            compact_results = {name: _compact_result(name, r) for name, r in round_results.items()}
+            
+            # Check for errors in results
+            errors = [isinstance(v, dict) and "error" in v for v in round_results.values()]
+            has_errors = any(errors)
+            consecutive_error_rounds = consecutive_error_rounds + 1 if all(errors) else 0
+            if consecutive_error_rounds >= MAX_ERROR_ROUNDS:
+                # Tools keep failing — more rounds only cost LLM calls
+                logger.warning("Planner tools failed %d rounds in a row; stopping", consecutive_error_rounds)
+                final_strategy = planner_response
+                break
+            error_note = ""
+            if has_errors:
+                error_note = (
+                    "\n\n⚠️ Some tools returned errors. Do NOT retry them. "
+                    "Use your own knowledge to estimate costs and details for the failed tools. "
+                    "Proceed with planning using whatever data you have."
+                )
+            
+            feedback = (
+                f"Round {round_num} complete. Tools called: {tools_called}\n\n"
+                f"Results:\n{prompt_json(compact_results)}"
+                f"{error_note}\n\n"
+                f"Analyze these results. Then either:\n"
+                f"- Call more tools if you need additional data (but do NOT retry failed tools)\n"
+                f"- Set stop=true and provide your final strategy if you have enough info\n\n"
+                f"Rounds remaining: {MAX_TOOL_ROUNDS - round_num}"
             )
-        
-        feedback = (
-            f"Round {round_num} complete. Tools called: {tools_called}\n\n"
-            f"Results:\n{json.dumps(round_results, indent=2, default=str)}"
-            f"{error_note}\n\n"
-            f"Analyze these results. Then either:\n"
-            f"- Call more tools if you need additional data (but do NOT retry failed tools)\n"
-            f"- Set stop=true and provide your final strategy if you have enough info\n\n"
-            f"Rounds remaining: {MAX_TOOL_ROUNDS - round_num}"
-        )
-        loop_messages.append(HumanMessage(content=feedback))
-        
-        # Save latest strategy in case we hit max rounds
-        final_strategy = planner_response
+            loop_messages.append(HumanMessage(content=feedback))
+            gathered.update(compact_results)
+            loop_messages = _trim_history(head, loop_messages, all_tool_calls, gathered)
+            
+            # Save latest strategy in case we hit max rounds
+            final_strategy = planner_response
+    finally:
+        # Also on errors and cancellation (e.g. the SSE client went away)
+        _cancel_speculative(speculative)
     
     # ── Build final state update ──
     if final_strategy is None:
         # Fallback — no valid response was ever parsed
-        final_strategy = PlannerLLMResponse(
-            stop=True,
-            summary=f"Trip to {trip_request.get('destination', 'destination')}",
-            selected_cities=[trip_request.get("destination", "")],
-            key_experiences=["Local food", "Cultural sites", "City exploration"],
-            budget_allocation={"flights": 30, "hotels": 35, "activities": 20, "food": 10, "misc": 5},
-            cost_estimates={"total": trip_request.get("budget_max", 2000)},
-            recommendations=["Explore local food markets", "Visit cultural landmarks"],
-        )
+        final_strategy = _FALLBACK_STRATEGY.model_copy(update={
+            "summary": f"Trip to {trip_request.get('destination', 'destination')}",
+            "selected_cities": [trip_request.get("destination", "")],
+            "cost_estimates": {"total": trip_request.get("budget_max", 2000)},
+        })
     
-    strategy_dict = final_strategy.dict(exclude={"tool_requests", "stop"})
+    strategy_dict = final_strategy.model_dump(exclude={"tool_requests", "stop"})
     
     return {
         "tool_plan": all_tool_calls,
-        "tool_results": all_tool_results,
+        "tool_results": dict(all_tool_results),
         "trip_strategy": strategy_dict,
         "current_node": "itinerary_gen",
         "messages": [{
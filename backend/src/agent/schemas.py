@@ -1,4 +1,4 @@
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 from typing import Optional, List
 from datetime import date
 
@@ -29,6 +29,8 @@ class SlotFillingResponse(BaseModel):
 
 class ToolRequest(BaseModel):
     """A single tool the planner wants to invoke."""
+    model_config = ConfigDict(frozen=True)
+    
     tool_name: str = Field(..., description="One of: search_flights, search_hotels, search_attractions, get_weather")
     parameters: dict = Field(default_factory=dict, description="Parameters for the tool")
 
@@ -39,6 +41,9 @@ class PlannerLLMResponse(BaseModel):
     to indicate it has gathered all necessary information.
     """
     
+    # Read-only once parsed; the fallback is derived with model_copy()
+    model_config = ConfigDict(frozen=True)
+    
     # ── Loop control ──
     stop: bool = Field(False, description="Set to true when all needed info is gathered and planning is complete")
     reasoning: str = Field("", description="Brief reasoning for this round's decisions")
@@ -60,6 +65,8 @@ class PlannerLLMResponse(BaseModel):
 
 class ItineraryActivity(BaseModel):
     """A single activity in the itinerary."""
+    model_config = ConfigDict(frozen=True)
+    
     time: str = Field(..., description="Time slot like '09:00 AM'")
     title: str = Field(..., description="Activity title")
     description: str = Field("", description="Brief description")
@@ -72,6 +79,8 @@ class ItineraryActivity(BaseModel):
 
 class ItineraryDay(BaseModel):
     """A single day in the itinerary."""
+    model_config = ConfigDict(frozen=True)
+    
     day_number: int
     date: str = Field(..., description="Date in YYYY-MM-DD format")
     theme: str = Field("", description="Day theme like 'Cultural Exploration'")
@@ -18,13 +18,13 @@ class AgentState(TypedDict):
     
     # Node 2: Planning + Tools
     tool_plan: list              # tools to execute
-    tool_results: dict           # results from tool execution
+    tool_results: dict           # tool_name -> list of results from tool execution
     trip_strategy: dict          # high-level strategy
     
     # Node 3: Itinerary Generation
     itinerary: dict              # generated day-wise itinerary
     
-    # Node 3.5: Review (human-in-the-loop)
+    # Review (human-in-the-loop, set by the API between runs)
     review_status: str           # "pending" | "approved" | "revision_requested"
     review_feedback: str         # user's revision notes (if any)
     
@@ -0,0 +1,130 @@
+"""Async Amadeus REST client shared by the flight and hotel tools.
+
+Talks to the Amadeus Self-Service APIs directly over one module-level
+httpx.AsyncClient (HTTP/2, keep-alive pool) instead of the blocking SDK,
+so searches never leave the event loop. The OAuth bearer token is cached
+in-process and in Redis until shortly before it expires, so a search
+normally needs no token round-trip and every worker shares one token.
+"""
+
+import time
+import asyncio
+import httpx
+import orjson
+from src.config import settings
+from src.database import get_redis_client
+
+# Refresh the token this many seconds before Amadeus says it expires
+TOKEN_EXPIRY_MARGIN = 60
+
+_http = httpx.AsyncClient(
+    base_url=settings.AMADEUS_BASE_URL,
+    http2=True,
+    limits=httpx.Limits(max_connections=64, max_keepalive_connections=32),
+    timeout=10,
+)
+
+# (token, time.monotonic() deadline); the lock lets one request refresh it
+_token: tuple = None
+_token_lock = asyncio.Lock()
+
+
+class AmadeusError(Exception):
+    """A non-2xx response from Amadeus."""
+    
+    def __init__(self, message: str, status_code: int = None):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+async def close_amadeus_client():
+    """Close the shared HTTP client's pooled connections (app shutdown)."""
+    await _http.aclose()
+    print("Closed Amadeus HTTP client")
+
+
+def _token_key() -> str:
+    return f"amadeus_token:{settings.AMADEUS_API_KEY}"
+
+
+def _error_from(response: httpx.Response) -> AmadeusError:
+    """Build an AmadeusError from the response's `errors` list, if any."""
+    try:
+        errors = orjson.loads(response.content).get("errors") or [{}]
+        detail = errors[0].get("detail") or errors[0].get("title") or response.text
+    except (orjson.JSONDecodeError, AttributeError):
+        detail = response.text
+    return AmadeusError(f"[{response.status_code}] {detail}", response.status_code)
+
+
+async def _get_token(refresh: bool = False) -> str:
+    """Bearer token for the configured API key — in-process, from Redis, or a fresh one."""
+    global _token
+    if not refresh and _token and time.monotonic() < _token[1]:
+        return _token[0]
+    
+    async with _token_lock:
+        # Another request may have refreshed it while this one waited
+        if not refresh and _token and time.monotonic() < _token[1]:
+            return _token[0]
+        token, ttl = await _load_token(refresh)
+        _token = (token, time.monotonic() + ttl)
+        return token
+
+
+async def _load_token(refresh: bool) -> tuple:
+    """(token, seconds it stays usable) — shared via Redis, else from Amadeus."""
+    redis = get_redis_client()
+    
+    if redis and not refresh:
+        try:
+            async with redis.pipeline(transaction=False) as pipe:
+                token, ttl = await pipe.get(_token_key()).ttl(_token_key()).execute()
+            if token and ttl > 0:
+                return token, ttl
+        except Exception:
+            pass
+    
+    response = await _http.post(
+        "/v1/security/oauth2/token",
+        data={
+            "grant_type": "client_credentials",
+            "client_id": settings.AMADEUS_API_KEY,
+            "client_secret": settings.AMADEUS_API_SECRET,
+        },
+    )
+    if response.is_error:
+        raise _error_from(response)
+    
+    data = orjson.loads(response.content)
+    token = data["access_token"]
+    ttl = int(data.get("expires_in", 0)) - TOKEN_EXPIRY_MARGIN
+    if redis and ttl > 0:
+        try:
+            await redis.set(_token_key(), token, ex=ttl)
+        except Exception:
+            pass
+    return token, max(ttl, 0)
+
+
+async def amadeus_get(path: str, params: dict, decoder=None) -> list:
+    """GET an Amadeus endpoint and return the response's `data` list.
+    
+    With a msgspec decoder (for a Struct with a `data` field) the body is
+    decoded straight into typed structs; otherwise into plain dicts.
+    
+    Raises AmadeusError on a non-2xx response. A 401 (token revoked or
+    expired early) is retried once with a fresh token.
+    """
+    token = await _get_token()
+    response = await _http.get(path, params=params, headers={"Authorization": f"Bearer {token}"})
+    
+    if response.status_code == 401:
+        token = await _get_token(refresh=True)
+        response = await _http.get(path, params=params, headers={"Authorization": f"Bearer {token}"})
+    
+    if response.is_error:
+        raise _error_from(response)
+    if decoder is not None:
+        return decoder.decode(response.content).data
+    return orjson.loads(response.content).get("data", [])
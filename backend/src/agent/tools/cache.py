@@ -2,117 +2,214 @@
 
 Provides a simple key-value cache with TTL using the app's existing
 Redis connection. Keys are built from function name + args to ensure
-uniqueness. Cached results are JSON-serialized.
+uniqueness. Tool results are stored as MessagePack bytes (smaller and
+faster to decode than JSON text) through the binary Redis client.
 """
 
-import json
-import hashlib
+import orjson
+import msgspec
+import xxhash
 from typing import Optional
-from src.database import get_redis_client
+from src.database import get_database, get_redis_client, get_redis_binary_client
 
 # Default cache TTLs (in seconds)
 FLIGHT_CACHE_TTL = 900     # 15 minutes — prices change frequently
 HOTEL_CACHE_TTL = 1800     # 30 minutes — availability changes less often
+USER_PREFS_CACHE_TTL = 3600  # 1 hour — invalidated on profile update anyway
+
+# Key prefixes for cached tool results — v2 is MessagePack, so old JSON entries never collide
+FLIGHT_CACHE_PREFIX = "flights:v2"
+HOTEL_CACHE_PREFIX = "hotels:v2"
+
+# Unknown types (datetime, ObjectId, ...) are stored as strings, as with JSON
+_encoder = msgspec.msgpack.Encoder(enc_hook=str)
+_decoder = msgspec.msgpack.Decoder()
 
 
 def _build_cache_key(prefix: str, **kwargs) -> str:
     """Build a deterministic cache key from prefix + sorted kwargs."""
     # Sort kwargs for consistency, exclude None values
     filtered = {k: v for k, v in sorted(kwargs.items()) if v is not None}
-    raw = json.dumps(filtered, sort_keys=True, default=str)
-    key_hash = hashlib.sha256(raw.encode()).hexdigest()[:16]
+    raw = orjson.dumps(filtered, option=orjson.OPT_SORT_KEYS, default=str)
+    # Non-cryptographic: keys only need to be unique, not tamper-proof
+    key_hash = xxhash.xxh3_64_hexdigest(raw)
     return f"cache:{prefix}:{key_hash}"
 
 
-def get_cached(prefix: str, **kwargs) -> Optional[dict]:
+async def _async_get(redis, key: str) -> Optional[dict]:
+    """Async Redis GET + MessagePack decode."""
+    raw = await redis.get(key)
+    if raw:
+        return _decoder.decode(raw)
+    return None
+
+
+async def _async_set(redis, key: str, data: dict, ttl: int) -> None:
+    """Async Redis SET with TTL."""
+    await redis.set(key, _encoder.encode(data), ex=ttl)
+
+
+async def aget_cached(prefix: str, **kwargs) -> Optional[dict]:
+    """Get a cached result. Returns None on miss or if Redis is unavailable."""
+    try:
+        redis = get_redis_binary_client()
+        if not redis:
+            return None
+        key = _build_cache_key(prefix, **kwargs)
+        return await _async_get(redis, key)
+    except Exception:
+        return None
+
+
+async def aset_cached(prefix: str, data: dict, ttl: int, **kwargs) -> None:
+    """Set a cache entry with TTL. Fails silently if Redis is unavailable."""
+    try:
+        redis = get_redis_binary_client()
+        if not redis:
+            return
+        key = _build_cache_key(prefix, **kwargs)
+        await _async_set(redis, key, data, ttl)
+    except Exception:
+        pass
+
+
+async def aget_cached_many(lookups: list) -> list:
+    """Batch aget_cached over (prefix, kwargs) pairs with a single MGET.
+    
+    Returns one result (or None on miss) per lookup; all None if Redis is unavailable.
     """
-    Get a cached result. Returns None on miss or if Redis is unavailable.
+    misses = [None] * len(lookups)
+    try:
+        redis = get_redis_binary_client()
+        if not redis or not lookups:
+            return misses
+        raws = await redis.mget([_build_cache_key(prefix, **kwargs) for prefix, kwargs in lookups])
+        return [_decoder.decode(raw) if raw else None for raw in raws]
+    except Exception:
+        return misses
+
+
+async def aset_cached_many(entries: list) -> None:
+    """Batch aset_cached over (prefix, data, ttl, kwargs) tuples in one pipelined round-trip.
     
-    This is a SYNC function because the tool functions that call it
-    (search_flights, search_hotels) are sync.
+    Fails silently if Redis is unavailable.
     """
+    try:
+        redis = get_redis_binary_client()
+        if not redis or not entries:
+            return
+        async with redis.pipeline(transaction=False) as pipe:
+            for prefix, data, ttl, kwargs in entries:
+                pipe.set(_build_cache_key(prefix, **kwargs), _encoder.encode(data), ex=ttl)
+            await pipe.execute()
+    except Exception:
+        pass
+
+
+# ── User preferences (read by the agent initializer on every run) ──
+
+def _user_prefs_key(user_id: str) -> str:
+    return f"user_prefs:{user_id}"
+
+
+async def aget_user_prefs(user_id: str) -> Optional[dict]:
+    """Cached preferences for a user. Returns None on miss or if Redis is unavailable."""
     try:
         redis = get_redis_client()
         if not redis:
             return None
-        
-        key = _build_cache_key(prefix, **kwargs)
-        
-        # Use the sync Redis interface via asyncio
-        import asyncio
-        try:
-            loop = asyncio.get_running_loop()
-            # We're in an async context — can't block, skip cache
-            return None
-        except RuntimeError:
-            pass
-        
-        # No running loop — safe to create one
-        result = asyncio.run(_async_get(redis, key))
-        return result
+        raw = await redis.get(_user_prefs_key(user_id))
+        if raw is not None:
+            return orjson.loads(raw)
+        return None
     except Exception:
         return None
 
 
-def set_cached(prefix: str, data: dict, ttl: int, **kwargs) -> None:
-    """
-    Set a cache entry with TTL. Fails silently if Redis is unavailable.
-    """
+async def aset_user_prefs(user_id: str, preferences: dict) -> None:
+    """Cache a user's preferences. Fails silently if Redis is unavailable."""
     try:
         redis = get_redis_client()
         if not redis:
             return
-        
-        key = _build_cache_key(prefix, **kwargs)
-        
-        import asyncio
-        try:
-            loop = asyncio.get_running_loop()
-            # In async context — schedule as task
-            loop.create_task(_async_set(redis, key, data, ttl))
-            return
-        except RuntimeError:
-            pass
-        
-        asyncio.run(_async_set(redis, key, data, ttl))
+        await redis.setex(
+            _user_prefs_key(user_id),
+            USER_PREFS_CACHE_TTL,
+            orjson.dumps(preferences, default=str),
+        )
     except Exception:
         pass
 
 
-async def _async_get(redis, key: str) -> Optional[dict]:
-    """Async Redis GET + JSON decode."""
-    raw = await redis.get(key)
-    if raw:
-        return json.loads(raw)
-    return None
+async def ainvalidate_user_prefs(user_id: str) -> None:
+    """Drop a user's cached preferences. Fails silently if Redis is unavailable."""
+    try:
+        redis = get_redis_client()
+        if not redis:
+            return
+        await redis.delete(_user_prefs_key(user_id))
+    except Exception:
+        pass
 
 
-async def _async_set(redis, key: str, data: dict, ttl: int) -> None:
-    """Async Redis SET with TTL."""
-    await redis.set(key, json.dumps(data, default=str), ex=ttl)
+# ── Registered emails (lets /register skip Mongo for new addresses) ──
+# Only a hint: a hit is confirmed against Mongo, and the unique email index
+# stays the authority, so a missing or stale entry never blocks anyone.
 
+REGISTERED_EMAILS_KEY = "emails:registered"
+_EMAILS_SEEDED_KEY = "emails:registered:seeded"
+_EMAIL_SEED_BATCH = 1000
 
-# ── Async-native functions (for use in async contexts) ──
 
-async def aget_cached(prefix: str, **kwargs) -> Optional[dict]:
-    """Async version of get_cached."""
+async def aemail_maybe_registered(email: str) -> bool:
+    """False only when the email is definitely new; True if maybe taken or Redis can't say."""
     try:
         redis = get_redis_client()
         if not redis:
-            return None
-        key = _build_cache_key(prefix, **kwargs)
-        return await _async_get(redis, key)
+            return True
+        return bool(await redis.sismember(REGISTERED_EMAILS_KEY, email))
     except Exception:
-        return None
+        return True
 
 
-async def aset_cached(prefix: str, data: dict, ttl: int, **kwargs) -> None:
-    """Async version of set_cached."""
+async def aadd_registered_email(email: str) -> None:
+    """Record a newly registered email. Fails silently if Redis is unavailable."""
     try:
         redis = get_redis_client()
         if not redis:
             return
-        key = _build_cache_key(prefix, **kwargs)
-        await _async_set(redis, key, data, ttl)
+        await redis.sadd(REGISTERED_EMAILS_KEY, email)
     except Exception:
         pass
+
+
+async def aseed_registered_emails() -> None:
+    """Load every existing user's email into the set, once per Redis (app startup).
+    
+    A SET NX flag lets only the first worker ever to start scan the users
+    collection; later starts skip it. Fails silently (and clears the flag so
+    the next start retries): without the set, every email just looks
+    possibly taken.
+    """
+    try:
+        redis = get_redis_client()
+        if not redis:
+            return
+        if not await redis.set(_EMAILS_SEEDED_KEY, 1, nx=True):
+            return
+    except Exception as e:
+        print(f"Could not seed registered emails: {e}")
+        return
+    
+    try:
+        cursor = get_database().users.find({}, projection={"_id": 0, "email": 1})
+        while batch := await cursor.to_list(length=_EMAIL_SEED_BATCH):
+            emails = [user["email"] for user in batch if user.get("email")]
+            if emails:
+                await redis.sadd(REGISTERED_EMAILS_KEY, *emails)
+    except Exception as e:
+        print(f"Could not seed registered emails: {e}")
+        try:
+            await redis.delete(_EMAILS_SEEDED_KEY)
+        except Exception:
+            pass
@@ -3,88 +3,88 @@
 Results are cached in Redis for 15 minutes to reduce API calls.
 """
 
-import json
-import hashlib
-from amadeus import Client, ResponseError
-from src.config import settings
-from src.database import get_redis_client
+import msgspec
+from typing import Optional
+from src.agent.tools.amadeus_client import amadeus_get, AmadeusError
+from src.agent.tools.cache import aget_cached, aset_cached, FLIGHT_CACHE_PREFIX, FLIGHT_CACHE_TTL
 
-FLIGHT_CACHE_TTL = 900  # 15 minutes
 
+# ── Flight Offers response shape (only the fields we read) ──
+# Decoded by msgspec in one pass; unknown fields are skipped.
 
-def _get_amadeus_client() -> Client:
-    """Get an authenticated Amadeus client."""
-    return Client(
-        client_id=settings.AMADEUS_API_KEY,
-        client_secret=settings.AMADEUS_API_SECRET,
-    )
+class _Endpoint(msgspec.Struct):
+    iataCode: str = ""
+    at: str = ""
 
 
-def _build_cache_key(origin, destination, departure_date, return_date, travelers) -> str:
-    """Build a deterministic cache key."""
-    raw = json.dumps({
-        "fn": "search_flights",
-        "o": origin, "d": destination,
-        "dd": departure_date, "rd": return_date,
-        "t": travelers
-    }, sort_keys=True)
-    h = hashlib.sha256(raw.encode()).hexdigest()[:16]
-    return f"cache:flights:{h}"
+class _Aircraft(msgspec.Struct):
+    code: str = ""
 
 
-def search_flights(
+class _Segment(msgspec.Struct):
+    departure: _Endpoint
+    arrival: _Endpoint
+    carrierCode: str = ""
+    number: str = ""
+    duration: str = ""
+    aircraft: _Aircraft = msgspec.field(default_factory=_Aircraft)
+
+
+class _Itinerary(msgspec.Struct):
+    duration: str = ""
+    segments: list[_Segment] = []
+
+
+class _Price(msgspec.Struct):
+    grandTotal: str = ""
+    currency: str = "USD"
+    total: str = ""
+
+
+class _FareDetail(msgspec.Struct):
+    cabin: str = "ECONOMY"
+
+
+class _TravelerPricing(msgspec.Struct):
+    fareDetailsBySegment: list[_FareDetail] = []
+
+
+class _FlightOffer(msgspec.Struct):
+    id: str = ""
+    price: _Price = msgspec.field(default_factory=_Price)
+    itineraries: list[_Itinerary] = []
+    travelerPricings: list[_TravelerPricing] = []
+    numberOfBookableSeats: Optional[int] = None
+
+
+class _FlightOffersResponse(msgspec.Struct):
+    data: list[_FlightOffer] = []
+
+
+# Lax mode: tolerate numbers sent as strings and the like
+_OFFERS_DECODER = msgspec.json.Decoder(_FlightOffersResponse, strict=False)
+
+
+def _cabin(offer: _FlightOffer) -> str:
+    """Cabin of the first segment for the first traveler."""
+    if offer.travelerPricings and offer.travelerPricings[0].fareDetailsBySegment:
+        return offer.travelerPricings[0].fareDetailsBySegment[0].cabin
+    return "ECONOMY"
+
+
+async def afetch_flights(
     origin: str,
     destination: str,
     departure_date: str,
     return_date: str = None,
     travelers: int = 1
 ) -> dict:
-    """
-    Search for flight offers using the Amadeus Flight Offers Search API.
-    Results are cached in Redis for 15 minutes.
-    
-    Args:
-        origin: IATA airport/city code (e.g., "JFK", "DEL")
-        destination: IATA airport/city code (e.g., "NRT", "CDG")
-        departure_date: Date in YYYY-MM-DD format
-        return_date: Optional return date in YYYY-MM-DD format
-        travelers: Number of adult travelers
+    """Uncached flight search: Amadeus call + response parsing.
     
-    Returns:
-        dict with flight offers or error information
+    Same parameters as asearch_flights, which is the version to call
+    unless you manage the cache yourself (see the planner's batched lookups).
     """
-    # ── Check cache ──
-    cache_key = _build_cache_key(origin, destination, departure_date, return_date, travelers)
-    try:
-        redis = get_redis_client()
-        if redis:
-            import asyncio
-            try:
-                loop = asyncio.get_running_loop()
-                # Use a sync-compatible approach — run_coroutine_threadsafe
-                import concurrent.futures
-                future = asyncio.run_coroutine_threadsafe(redis.get(cache_key), loop)
-                cached = future.result(timeout=2)
-                if cached:
-                    result = json.loads(cached)
-                    result["_cached"] = True
-                    return result
-            except RuntimeError:
-                # No running loop — use asyncio.run
-                cached = asyncio.run(redis.get(cache_key))
-                if cached:
-                    result = json.loads(cached)
-                    result["_cached"] = True
-                    return result
-            except Exception:
-                pass
-    except Exception:
-        pass
-    
-    # ── API call ──
     try:
-        amadeus = _get_amadeus_client()
-        
         params = {
             "originLocationCode": origin,
             "destinationLocationCode": destination,
@@ -97,40 +97,40 @@ def search_flights(
         if return_date:
             params["returnDate"] = return_date
         
-        response = amadeus.shopping.flight_offers_search.get(**params)
+        offers = await amadeus_get("/v2/shopping/flight-offers", params, decoder=_OFFERS_DECODER)
         
         # Parse the response into a cleaner format
         flights = []
-        for offer in response.data:
+        for offer in offers:
             itineraries = []
-            for itin in offer.get("itineraries", []):
-                segments = []
-                for seg in itin.get("segments", []):
-                    segments.append({
-                        "departure_airport": seg["departure"]["iataCode"],
-                        "departure_time": seg["departure"].get("at", ""),
-                        "arrival_airport": seg["arrival"]["iataCode"],
-                        "arrival_time": seg["arrival"].get("at", ""),
-                        "carrier": seg.get("carrierCode", ""),
-                        "flight_number": f"{seg.get('carrierCode', '')}{seg.get('number', '')}",
-                        "duration": seg.get("duration", ""),
-                        "aircraft": seg.get("aircraft", {}).get("code", ""),
-                    })
+            for itin in offer.itineraries:
+                segments = [
+                    {
+                        "departure_airport": seg.departure.iataCode,
+                        "departure_time": seg.departure.at,
+                        "arrival_airport": seg.arrival.iataCode,
+                        "arrival_time": seg.arrival.at,
+                        "carrier": seg.carrierCode,
+                        "flight_number": f"{seg.carrierCode}{seg.number}",
+                        "duration": seg.duration,
+                        "aircraft": seg.aircraft.code,
+                    }
+                    for seg in itin.segments
+                ]
                 itineraries.append({
-                    "duration": itin.get("duration", ""),
+                    "duration": itin.duration,
                     "segments": segments,
                     "stops": len(segments) - 1,
                 })
             
-            price_info = offer.get("price", {})
             flights.append({
-                "id": offer.get("id", ""),
-                "price_total": price_info.get("grandTotal", ""),
-                "price_currency": price_info.get("currency", "USD"),
-                "price_per_traveler": price_info.get("total", ""),
+                "id": offer.id,
+                "price_total": offer.price.grandTotal,
+                "price_currency": offer.price.currency,
+                "price_per_traveler": offer.price.total,
                 "itineraries": itineraries,
-                "booking_class": offer.get("travelerPricings", [{}])[0].get("fareDetailsBySegment", [{}])[0].get("cabin", "ECONOMY"),
-                "seats_remaining": offer.get("numberOfBookableSeats", "N/A"),
+                "booking_class": _cabin(offer),
+                "seats_remaining": offer.numberOfBookableSeats if offer.numberOfBookableSeats is not None else "N/A",
             })
         
         result = {
@@ -143,31 +143,14 @@ def search_flights(
             "total_results": len(flights),
         }
         
-        # ── Store in cache ──
-        try:
-            if redis:
-                import asyncio
-                try:
-                    loop = asyncio.get_running_loop()
-                    asyncio.run_coroutine_threadsafe(
-                        redis.set(cache_key, json.dumps(result, default=str), ex=FLIGHT_CACHE_TTL),
-                        loop
-                    )
-                except RuntimeError:
-                    asyncio.run(redis.set(cache_key, json.dumps(result, default=str), ex=FLIGHT_CACHE_TTL))
-                except Exception:
-                    pass
-        except Exception:
-            pass
-        
         return result
     
-    except ResponseError as e:
+    except AmadeusError as e:
         return {
             "origin": origin,
             "destination": destination,
             "error": f"Amadeus API error: {str(e)}",
-            "status_code": getattr(e.response, "status_code", None),
+            "status_code": e.status_code,
         }
     except Exception as e:
         return {
@@ -175,3 +158,46 @@ def search_flights(
             "destination": destination,
             "error": f"Flight search failed: {str(e)}",
         }
+
+
+async def asearch_flights(
+    origin: str,
+    destination: str,
+    departure_date: str,
+    return_date: str = None,
+    travelers: int = 1
+) -> dict:
+    """
+    Search for flight offers using the Amadeus Flight Offers Search API.
+    Results are cached in Redis for 15 minutes.
+    
+    Args:
+        origin: IATA airport/city code (e.g., "JFK", "DEL")
+        destination: IATA airport/city code (e.g., "NRT", "CDG")
+        departure_date: Date in YYYY-MM-DD format
+        return_date: Optional return date in YYYY-MM-DD format
+        travelers: Number of adult travelers
+    
+    Returns:
+        dict with flight offers or error information
+    """
+    cache_args = {
+        "origin": origin, "destination": destination,
+        "departure_date": departure_date, "return_date": return_date,
+        "travelers": travelers,
+    }
+    
+    # ── Check cache ──
+    cached = await aget_cached(FLIGHT_CACHE_PREFIX, **cache_args)
+    if cached:
+        cached["_cached"] = True
+        return cached
+    
+    # ── API call ──
+    result = await afetch_flights(origin, destination, departure_date, return_date, travelers)
+    
+    # ── Store in cache ── (errors are not cached)
+    if "error" not in result:
+        await aset_cached(FLIGHT_CACHE_PREFIX, result, FLIGHT_CACHE_TTL, **cache_args)
+    
+    return result
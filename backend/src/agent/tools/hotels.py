@@ -3,80 +3,74 @@
 Results are cached in Redis for 30 minutes to reduce API calls.
 """
 
-import json
-import hashlib
-from amadeus import Client, ResponseError
-from src.config import settings
-from src.database import get_redis_client
+import msgspec
+from typing import Optional
+from src.agent.tools.amadeus_client import amadeus_get, AmadeusError
+from src.agent.tools.cache import aget_cached, aset_cached, HOTEL_CACHE_PREFIX, HOTEL_CACHE_TTL
 
-HOTEL_CACHE_TTL = 1800  # 30 minutes
 
+# ── Hotel List / Hotel Offers response shapes (only the fields we read) ──
+# Decoded by msgspec in one pass; unknown fields are skipped.
 
-def _get_amadeus_client() -> Client:
-    """Get an authenticated Amadeus client."""
-    return Client(
-        client_id=settings.AMADEUS_API_KEY,
-        client_secret=settings.AMADEUS_API_SECRET,
-    )
+class _HotelRef(msgspec.Struct):
+    hotelId: str = ""
 
 
-def _build_cache_key(city_code, checkin, checkout, guests, radius, radius_unit) -> str:
-    """Build a deterministic cache key."""
-    raw = json.dumps({
-        "fn": "search_hotels",
-        "c": city_code, "ci": checkin, "co": checkout,
-        "g": guests, "r": radius, "ru": radius_unit
-    }, sort_keys=True)
-    h = hashlib.sha256(raw.encode()).hexdigest()[:16]
-    return f"cache:hotels:{h}"
+class _HotelListResponse(msgspec.Struct):
+    data: list[_HotelRef] = []
 
 
-def _cache_get(cache_key: str):
-    """Try to get a cached result from Redis."""
-    try:
-        redis = get_redis_client()
-        if not redis:
-            return None
-        import asyncio
-        try:
-            loop = asyncio.get_running_loop()
-            import concurrent.futures
-            future = asyncio.run_coroutine_threadsafe(redis.get(cache_key), loop)
-            cached = future.result(timeout=2)
-        except RuntimeError:
-            cached = asyncio.run(redis.get(cache_key))
-        
-        if cached:
-            result = json.loads(cached)
-            result["_cached"] = True
-            return result
-    except Exception:
-        pass
-    return None
+class _Hotel(msgspec.Struct):
+    hotelId: str = ""
+    name: str = ""
+    cityCode: Optional[str] = None
+    latitude: Optional[float] = None
+    longitude: Optional[float] = None
 
 
-def _cache_set(cache_key: str, data: dict):
-    """Store a result in Redis cache."""
-    try:
-        redis = get_redis_client()
-        if not redis:
-            return
-        import asyncio
-        try:
-            loop = asyncio.get_running_loop()
-            asyncio.run_coroutine_threadsafe(
-                redis.set(cache_key, json.dumps(data, default=str), ex=HOTEL_CACHE_TTL),
-                loop
-            )
-        except RuntimeError:
-            asyncio.run(redis.set(cache_key, json.dumps(data, default=str), ex=HOTEL_CACHE_TTL))
-        except Exception:
-            pass
-    except Exception:
-        pass
-
-
-def search_hotels(
+class _RoomType(msgspec.Struct):
+    category: str = ""
+    bedType: str = ""
+
+
+class _RoomDescription(msgspec.Struct):
+    text: str = ""
+
+
+class _Room(msgspec.Struct):
+    typeEstimated: _RoomType = msgspec.field(default_factory=_RoomType)
+    description: _RoomDescription = msgspec.field(default_factory=_RoomDescription)
+
+
+class _OfferPrice(msgspec.Struct):
+    total: str = ""
+    currency: str = "USD"
+    base: str = ""
+
+
+class _Offer(msgspec.Struct):
+    id: str = ""
+    checkInDate: str = ""
+    checkOutDate: str = ""
+    price: _OfferPrice = msgspec.field(default_factory=_OfferPrice)
+    room: _Room = msgspec.field(default_factory=_Room)
+
+
+class _HotelOffers(msgspec.Struct):
+    hotel: _Hotel = msgspec.field(default_factory=_Hotel)
+    offers: list[_Offer] = []
+
+
+class _HotelOffersResponse(msgspec.Struct):
+    data: list[_HotelOffers] = []
+
+
+# Lax mode: tolerate numbers sent as strings and the like
+_LIST_DECODER = msgspec.json.Decoder(_HotelListResponse, strict=False)
+_OFFERS_DECODER = msgspec.json.Decoder(_HotelOffersResponse, strict=False)
+
+
+async def afetch_hotels(
     city_code: str,
     checkin: str = None,
     checkout: str = None,
@@ -84,43 +78,27 @@ def search_hotels(
     radius: int = 30,
     radius_unit: str = "KM",
 ) -> dict:
-    """
-    Search for hotels using the Amadeus Hotel List + Hotel Offers APIs.
-    Results are cached in Redis for 30 minutes.
+    """Uncached hotel search: Amadeus calls + response parsing.
+    
+    Same parameters as asearch_hotels, which is the version to call
+    unless you manage the cache yourself (see the planner's batched lookups).
     
     Two-step process:
       1. Hotel List API – find hotels by city code
       2. Hotel Offers API – get prices for those hotels
-    
-    Args:
-        city_code: IATA city code (e.g., "PAR", "TYO", "NYC")
-        checkin: Check-in date in YYYY-MM-DD format
-        checkout: Check-out date in YYYY-MM-DD format
-        guests: Number of guests
-        radius: Search radius from city center
-        radius_unit: "KM" or "MI"
-    
-    Returns:
-        dict with hotel offers or error information
     """
-    # ── Check cache ──
-    cache_key = _build_cache_key(city_code, checkin, checkout, guests, radius, radius_unit)
-    cached = _cache_get(cache_key)
-    if cached:
-        return cached
-    
-    # ── API call ──
     try:
-        amadeus = _get_amadeus_client()
-        
         # ── Step 1: Get hotel IDs by city ──
-        hotel_list_response = amadeus.reference_data.locations.hotels.by_city.get(
-            cityCode=city_code,
-            radius=radius,
-            radiusUnit=radius_unit,
+        hotel_list = await amadeus_get(
+            "/v1/reference-data/locations/hotels/by-city",
+            {"cityCode": city_code, "radius": radius, "radiusUnit": radius_unit},
+            decoder=_LIST_DECODER,
         )
         
-        if not hotel_list_response.data:
+        # Take top 5 hotel IDs (skipping entries Amadeus sent without one)
+        hotel_ids = [h.hotelId for h in hotel_list if h.hotelId][:5]
+        
+        if not hotel_ids:
             return {
                 "city_code": city_code,
                 "hotels": [],
@@ -128,12 +106,9 @@ def search_hotels(
                 "message": "No hotels found for this city code.",
             }
         
-        # Take top 5 hotel IDs
-        hotel_ids = [h["hotelId"] for h in hotel_list_response.data[:5]]
-        
         # ── Step 2: Get offers for those hotels ──
         params = {
-            "hotelIds": hotel_ids,
+            "hotelIds": ",".join(hotel_ids),
             "adults": guests,
         }
         if checkin:
@@ -141,36 +116,33 @@ def search_hotels(
         if checkout:
             params["checkOutDate"] = checkout
         
-        offers_response = amadeus.shopping.hotel_offers_search.get(**params)
+        hotel_offers = await amadeus_get("/v3/shopping/hotel-offers", params, decoder=_OFFERS_DECODER)
         
         # Parse the response
         hotels = []
-        for hotel_offer in offers_response.data:
-            hotel_info = hotel_offer.get("hotel", {})
-            offers = hotel_offer.get("offers", [])
-            
-            parsed_offers = []
-            for offer in offers[:3]:  # max 3 offers per hotel
-                price = offer.get("price", {})
-                room = offer.get("room", {})
-                parsed_offers.append({
-                    "offer_id": offer.get("id", ""),
-                    "check_in": offer.get("checkInDate", ""),
-                    "check_out": offer.get("checkOutDate", ""),
-                    "price_total": price.get("total", ""),
-                    "price_currency": price.get("currency", "USD"),
-                    "price_per_night": price.get("base", ""),
-                    "room_type": room.get("typeEstimated", {}).get("category", ""),
-                    "bed_type": room.get("typeEstimated", {}).get("bedType", ""),
-                    "description": room.get("description", {}).get("text", ""),
-                })
+        for hotel_offer in hotel_offers:
+            hotel_info = hotel_offer.hotel
+            parsed_offers = [
+                {
+                    "offer_id": offer.id,
+                    "check_in": offer.checkInDate,
+                    "check_out": offer.checkOutDate,
+                    "price_total": offer.price.total,
+                    "price_currency": offer.price.currency,
+                    "price_per_night": offer.price.base,
+                    "room_type": offer.room.typeEstimated.category,
+                    "bed_type": offer.room.typeEstimated.bedType,
+                    "description": offer.room.description.text,
+                }
+                for offer in hotel_offer.offers[:3]  # max 3 offers per hotel
+            ]
             
             hotels.append({
-                "hotel_id": hotel_info.get("hotelId", ""),
-                "name": hotel_info.get("name", ""),
-                "city_code": hotel_info.get("cityCode", city_code),
-                "latitude": hotel_info.get("latitude"),
-                "longitude": hotel_info.get("longitude"),
+                "hotel_id": hotel_info.hotelId,
+                "name": hotel_info.name,
+                "city_code": hotel_info.cityCode or city_code,
+                "latitude": hotel_info.latitude,
+                "longitude": hotel_info.longitude,
                 "offers": parsed_offers,
             })
         
@@ -183,19 +155,60 @@ def search_hotels(
             "total_results": len(hotels),
         }
         
-        # ── Store in cache ──
-        _cache_set(cache_key, result)
-        
         return result
     
-    except ResponseError as e:
+    except AmadeusError as e:
         return {
             "city_code": city_code,
             "error": f"Amadeus API error: {str(e)}",
-            "status_code": getattr(e.response, "status_code", None),
+            "status_code": e.status_code,
         }
     except Exception as e:
         return {
             "city_code": city_code,
             "error": f"Hotel search failed: {str(e)}",
         }
+
+
+async def asearch_hotels(
+    city_code: str,
+    checkin: str = None,
+    checkout: str = None,
+    guests: int = 1,
+    radius: int = 30,
+    radius_unit: str = "KM",
+) -> dict:
+    """
+    Search for hotels using the Amadeus Hotel List + Hotel Offers APIs.
+    Results are cached in Redis for 30 minutes.
+    
+    Args:
+        city_code: IATA city code (e.g., "PAR", "TYO", "NYC")
+        checkin: Check-in date in YYYY-MM-DD format
+        checkout: Check-out date in YYYY-MM-DD format
+        guests: Number of guests
+        radius: Search radius from city center
+        radius_unit: "KM" or "MI"
+    
+    Returns:
+        dict with hotel offers or error information
+    """
+    cache_args = {
+        "city_code": city_code, "checkin": checkin, "checkout": checkout,
+        "guests": guests, "radius": radius, "radius_unit": radius_unit,
+    }
+    
+    # ── Check cache ──
+    cached = await aget_cached(HOTEL_CACHE_PREFIX, **cache_args)
+    if cached:
+        cached["_cached"] = True
+        return cached
+    
+    # ── API call ──
+    result = await afetch_hotels(city_code, checkin, checkout, guests, radius, radius_unit)
+    
+    # ── Store in cache ── (errors are not cached)
+    if "error" not in result:
+        await aset_cached(HOTEL_CACHE_PREFIX, result, HOTEL_CACHE_TTL, **cache_args)
+    
+    return result
@@ -1,7 +1,10 @@
+import asyncio
 from fastapi import APIRouter, HTTPException, status, Depends, Body
 from fastapi.security import OAuth2PasswordBearer
+from pymongo.errors import DuplicateKeyError
 from src.models.user import UserCreate, UserResponse, UserInDB
 from src.database import get_database
+from src.agent.tools.cache import aemail_maybe_registered, aadd_registered_email
 from src.auth.utils import get_password_hash, verify_password, create_access_token
 from datetime import datetime
 from typing import Any
@@ -12,35 +15,51 @@ oauth2_scheme = OAuth2PasswordBearer(tokenUrl="token")
 @router.post("/register", response_model=UserResponse)
 async def register(user: UserCreate = Body(...)):
     db = get_database()
-    existing_user = await db.users.find_one({"email": user.email})
-    if existing_user:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Email already registered"
-        )
+    # Only a possible match in the Redis set is worth a Mongo lookup, and
+    # Mongo has the final say
+    if await aemail_maybe_registered(user.email):
+        if await db.users.find_one({"email": user.email}, projection={"_id": 1}):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Email already registered"
+            )
+        # A stale set entry (user since removed) doesn't block anyone; the
+        # insert below re-adds the email
     
-    user_dict = user.dict()
-    password_hash = get_password_hash(user_dict.pop("password"))
+    user_dict = user.model_dump()
+    # bcrypt is deliberately slow; hash off the event loop
+    password_hash = await asyncio.to_thread(get_password_hash, user_dict.pop("password"))
     
+    now = datetime.utcnow()
     new_user = UserInDB(
         **user_dict,
         password_hash=password_hash,
-        created_at=datetime.utcnow(),
-        updated_at=datetime.utcnow()
+        created_at=now,
+        updated_at=now
     )
     
-    new_user_dict = new_user.dict(by_alias=True, exclude={"id"})
-    result = await db.users.insert_one(new_user_dict)
+    new_user_dict = new_user.model_dump(by_alias=True, exclude={"id"})
+    # The unique email index is the real guard: two concurrent registrations
+    # can both pass the check above, but only one insert succeeds
+    try:
+        result = await db.users.insert_one(new_user_dict)
+    except DuplicateKeyError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Email already registered"
+        )
+    await aadd_registered_email(user.email)
     
-    created_user = await db.users.find_one({"_id": result.inserted_id})
-    return UserResponse(**created_user)
+    # Everything the response needs is already here; no need to read it back
+    new_user_dict["_id"] = result.inserted_id
+    return UserResponse(**new_user_dict)
 
 @router.post("/login")
 async def login(email: str = Body(...), password: str = Body(...)):
     db = get_database()
     user = await db.users.find_one({"email": email})
     
-    if not user or not verify_password(password, user["password_hash"]):
+    if not user or not await asyncio.to_thread(verify_password, password, user["password_hash"]):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email or password",
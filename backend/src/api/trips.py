@@ -1,28 +1,84 @@
 """Trip planning API endpoints – Session-based chat with human-in-the-loop.
 
-Uses LangGraph's interrupt_before + MemorySaver for two pause points:
+Sessions are checkpointed per thread by the graph's Redis checkpointer
+(in-memory fallback for local development), with two pause points:
 1. After intent_slot (when slots incomplete → graph ends, API detects & prompts user)
-2. Before review node (interrupt_before → graph pauses with draft itinerary)
+2. After itinerary_gen (interrupt_after → graph pauses with draft itinerary)
 """
 
 import uuid
+import orjson
 from typing import Optional
 from datetime import datetime
-from fastapi import APIRouter, Body, Query, HTTPException, status
+from fastapi import APIRouter, Body, Depends, Query, HTTPException, status
+from fastapi.responses import Response, StreamingResponse
 from bson import ObjectId
 from src.database import get_database
-from src.agent.graph import travel_graph
+from src.agent.graph import get_travel_graph, get_checkpointer, CHECKPOINT_DURABILITY
 
 router = APIRouter()
 
 
+def _json(data) -> Response:
+    """JSON response encoded by orjson in one C pass.
+    
+    These endpoints return raw Mongo/graph dicts with no response model,
+    so FastAPI would otherwise walk them with jsonable_encoder and then
+    json.dumps. orjson handles datetimes natively; ObjectIds go through str.
+    """
+    return Response(orjson.dumps(data, option=orjson.OPT_NON_STR_KEYS, default=str), media_type="application/json")
+
+
 # ── List endpoints with time-range filters ──
 
+async def _date_range_filter(
+    from_date: Optional[str] = Query(None, description="Start of date range (YYYY-MM-DD)"),
+    to_date: Optional[str] = Query(None, description="End of date range (YYYY-MM-DD)"),
+) -> Optional[dict]:
+    """Mongo created_at filter for the from/to query params (to_date is inclusive)."""
+    if not (from_date or to_date):
+        return None
+    
+    date_filter: dict = {}
+    if from_date:
+        try:
+            date_filter["$gte"] = datetime.strptime(from_date, "%Y-%m-%d")
+        except ValueError:
+            raise HTTPException(status_code=400, detail="from_date must be YYYY-MM-DD")
+    if to_date:
+        try:
+            date_filter["$lte"] = datetime.strptime(to_date, "%Y-%m-%d").replace(hour=23, minute=59, second=59)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="to_date must be YYYY-MM-DD")
+    return date_filter
+
+
+async def _paginate(collection, query: dict, skip: int, limit: int) -> tuple:
+    """One page of `query` (newest first) plus the total match count.
+    
+    A single $facet aggregation, so the match runs once and it's one round-trip.
+    """
+    pipeline = [
+        {"$match": query},
+        {"$facet": {
+            "rows": [{"$sort": {"created_at": -1}}, {"$skip": skip}, {"$limit": limit}],
+            "total": [{"$count": "n"}],
+        }},
+    ]
+    cursor = await collection.aggregate(pipeline)
+    result = (await cursor.to_list(length=1))[0]
+    
+    rows = result["rows"]
+    for row in rows:
+        row["_id"] = str(row["_id"])
+    total = result["total"][0]["n"] if result["total"] else 0
+    return rows, total
+
+
 @router.get("/user/{user_id}")
 async def list_user_trips(
     user_id: str,
-    from_date: Optional[str] = Query(None, description="Start of date range (YYYY-MM-DD)"),
-    to_date: Optional[str] = Query(None, description="End of date range (YYYY-MM-DD)"),
+    date_filter: Optional[dict] = Depends(_date_range_filter),
     trip_status: Optional[str] = Query(None, description="Filter by status: planning, finalized, cancelled"),
     skip: int = Query(0, ge=0, description="Number of results to skip (pagination)"),
     limit: int = Query(20, ge=1, le=100, description="Max results to return"),
@@ -33,97 +89,48 @@ async def list_user_trips(
     query: dict = {"user_id": user_id}
     
     # Time-range filter on created_at
-    if from_date or to_date:
-        date_filter: dict = {}
-        if from_date:
-            try:
-                date_filter["$gte"] = datetime.strptime(from_date, "%Y-%m-%d")
-            except ValueError:
-                raise HTTPException(status_code=400, detail="from_date must be YYYY-MM-DD")
-        if to_date:
-            try:
-                date_filter["$lte"] = datetime.strptime(to_date, "%Y-%m-%d").replace(hour=23, minute=59, second=59)
-            except ValueError:
-                raise HTTPException(status_code=400, detail="to_date must be YYYY-MM-DD")
+    if date_filter:
         query["created_at"] = date_filter
     
     # Status filter
     if trip_status:
         query["status"] = trip_status
     
-    cursor = db.trips.find(query).sort("created_at", -1).skip(skip).limit(limit)
-    trips = []
-    async for trip in cursor:
-        trip["_id"] = str(trip["_id"])
-        trips.append(trip)
+    trips, total = await _paginate(db.trips, query, skip, limit)
     
-    # Get total count for pagination metadata
-    total = await db.trips.count_documents(query)
-    
-    return {
+    return _json({
         "trips": trips,
         "total": total,
         "skip": skip,
         "limit": limit,
-    }
+    })
 
 
 @router.get("/user/{user_id}/itineraries")
 async def list_user_itineraries(
     user_id: str,
-    from_date: Optional[str] = Query(None, description="Start of date range (YYYY-MM-DD)"),
-    to_date: Optional[str] = Query(None, description="End of date range (YYYY-MM-DD)"),
+    date_filter: Optional[dict] = Depends(_date_range_filter),
     skip: int = Query(0, ge=0, description="Number of results to skip (pagination)"),
     limit: int = Query(20, ge=1, le=100, description="Max results to return"),
 ):
     """List all itinerary versions across all trips for a user, with optional date-range filter."""
     db = get_database()
     
-    # First, get all trip_ids for this user
-    trip_cursor = db.trips.find({"user_id": user_id}, {"_id": 1})
-    trip_ids = []
-    async for trip in trip_cursor:
-        trip_ids.append(str(trip["_id"]))
-    
-    if not trip_ids:
-        return {
-            "itineraries": [],
-            "total": 0,
-            "skip": skip,
-            "limit": limit,
-        }
-    
-    query: dict = {"trip_id": {"$in": trip_ids}}
+    # Versions carry their trip's user_id, so no trip lookup is needed
+    query: dict = {"user_id": user_id}
     
     # Time-range filter on created_at
-    if from_date or to_date:
-        date_filter: dict = {}
-        if from_date:
-            try:
-                date_filter["$gte"] = datetime.strptime(from_date, "%Y-%m-%d")
-            except ValueError:
-                raise HTTPException(status_code=400, detail="from_date must be YYYY-MM-DD")
-        if to_date:
-            try:
-                date_filter["$lte"] = datetime.strptime(to_date, "%Y-%m-%d").replace(hour=23, minute=59, second=59)
-            except ValueError:
-                raise HTTPException(status_code=400, detail="to_date must be YYYY-MM-DD")
+    if date_filter:
         query["created_at"] = date_filter
     
-    cursor = db.itinerary_versions.find(query).sort("created_at", -1).skip(skip).limit(limit)
-    itineraries = []
-    async for itinerary in cursor:
-        itinerary["_id"] = str(itinerary["_id"])
-        itineraries.append(itinerary)
-    
-    total = await db.itinerary_versions.count_documents(query)
+    itineraries, total = await _paginate(db.itinerary_versions, query, skip, limit)
     
-    return {
+    return _json({
         "itineraries": itineraries,
         "total": total,
         "skip": skip,
         "limit": limit,
-    }
+    })
 
 
 def _get_latest_ai_message(state: dict) -> str:
@@ -135,6 +142,207 @@ def _get_latest_ai_message(state: dict) -> str:
     return "Your trip has been planned!"
 
 
+async def _load_thread_state(config: dict) -> dict:
+    """Read the latest checkpointed state values for a thread.
+    
+    Uses checkpointer.aget_tuple() rather than travel_graph.aget_state():
+    it returns the stored channel values directly and skips rebuilding the
+    StateSnapshot (task computation, subgraph state). The trade-off is that
+    pending writes are not merged and `next` is not computed — callers use
+    _is_awaiting_review() on the values instead.
+    """
+    checkpoint_tuple = await get_checkpointer().aget_tuple(config)
+    if checkpoint_tuple is None:
+        return {}
+    return checkpoint_tuple.checkpoint["channel_values"]
+
+
+def _is_awaiting_review(state: dict) -> bool:
+    """True if the graph is paused with a draft itinerary awaiting review."""
+    return state.get("current_node") == "review"
+
+
+# Replies to a draft itinerary that count as approval (compared lowercased)
+_APPROVAL_REPLIES = frozenset({"approve", "yes", "looks good", "confirm", "ok", "lgtm", "perfect"})
+
+
+# Replies to a finalized trip that can't change it (compared lowercased,
+# trailing punctuation stripped). Anything else re-runs the graph.
+_ACKNOWLEDGEMENTS = frozenset({
+    "thanks", "thank you", "thx", "ok", "okay", "great", "cool",
+    "awesome", "perfect", "nice", "got it", "sounds good",
+})
+
+
+def _is_acknowledgement(state: dict, message: str) -> bool:
+    """True for a plain acknowledgement (e.g. "thanks!") on a finalized trip.
+    
+    Re-running the graph for these would only re-plan the same trip. A
+    revised draft awaiting review still carries the old trip_id, so there an
+    "ok" is an approval, not an acknowledgement.
+    """
+    if not state.get("trip_id") or _is_awaiting_review(state):
+        return False
+    return message.strip().lower().rstrip("!. ") in _ACKNOWLEDGEMENTS
+
+
+async def _record_acknowledgement(travel_graph, config: dict, state: dict, message: str) -> dict:
+    """Append the acknowledgement and a short reply to the thread; return the new state."""
+    exchange = [
+        {"role": "user", "content": message},
+        {"role": "ai", "content": "You're welcome! Your trip is saved — message me any time you'd like to change it."},
+    ]
+    # As finalizer, so the thread stays finished (finalizer → END)
+    await travel_graph.aupdate_state(config, {"messages": exchange}, as_node="finalizer")
+    return {**state, "messages": state.get("messages", []) + exchange}
+
+
+def _resolve_thread(thread_id: Optional[str]) -> tuple:
+    """Return (thread_id, is_new_session), generating an ID for new sessions."""
+    if not thread_id:
+        return str(uuid.uuid4()), True
+    return thread_id, False
+
+
+async def _prepare_graph_input(travel_graph, config: dict, user_id: str, message: str, current_state: dict):
+    """Apply the user's message to the thread and return the input for the next run.
+    
+    New sessions (empty current_state) get a fresh initial state. Resumed
+    sessions have their checkpointed state updated in place and resume
+    from it (input None).
+    """
+    if not current_state:
+        # ── New session: Initialize the graph ──
+        return {
+            "user_id": user_id,
+            "user_preferences": {},
+            "messages": [{"role": "user", "content": message}],
+            "trip_request": {},
+            "slots_complete": False,
+            "clarification_count": 0,
+            "tool_plan": [],
+            "tool_results": {},
+            "trip_strategy": {},
+            "itinerary": {},
+            "review_status": "",
+            "review_feedback": "",
+            "trip_id": "",
+            "itinerary_version_id": "",
+            "current_node": "initializer"
+        }
+    
+    # ── Resume session: Check where the graph is paused ──
+    if _is_awaiting_review(current_state):
+        # Graph is paused after itinerary_gen
+        # User is responding to the draft itinerary. Updating as itinerary_gen
+        # re-runs its review routing, so the resumed run goes straight to
+        # finalizer or back to planner.
+        response_lower = message.strip().lower()
+        
+        if response_lower in _APPROVAL_REPLIES:
+            # User approved — update state and resume
+            await travel_graph.aupdate_state(
+                config,
+                {
+                    "review_status": "approved",
+                    "review_feedback": "",
+                    "current_node": "finalizer",
+                    "messages": [
+                        {"role": "user", "content": message},
+                        {"role": "ai", "content": "Itinerary approved! Saving your trip now..."},
+                    ]
+                },
+                as_node="itinerary_gen"
+            )
+        else:
+            # User wants revision — update state with feedback and resume
+            await travel_graph.aupdate_state(
+                config,
+                {
+                    "review_status": "revision_requested",
+                    "review_feedback": message,
+                    "current_node": "planner",
+                    "messages": [
+                        {"role": "user", "content": message},
+                        {"role": "ai", "content": "Got it! I'll re-plan based on your feedback and generate an updated itinerary."},
+                    ]
+                },
+                as_node="itinerary_gen"
+            )
+    else:
+        # Graph ended after intent_slot (clarification needed)
+        # OR graph completed but user is sending a follow-up
+        
+        # Update the state with the new user message and re-run
+        await travel_graph.aupdate_state(
+            config,
+            {
+                "messages": [{"role": "user", "content": message}],
+            },
+            as_node="initializer"  # Re-enter from initializer so it flows to intent_slot
+        )
+    
+    # Resume graph from the checkpoint
+    return None
+
+
+def _build_chat_response(thread_id: str, final_state: dict) -> dict:
+    """Shape the chat response from the thread's state after a run."""
+    
+    # Check if graph is paused for review (draft ready)
+    if _is_awaiting_review(final_state):
+        return {
+            "status": "reviewing",
+            "thread_id": thread_id,
+            "message": (
+                f"Here's your draft itinerary for "
+                f"{final_state.get('trip_request', {}).get('destination', 'your trip')}! "
+                f"Review it below and reply 'approve' to finalize, "
+                f"or tell me what you'd like to change."
+            ),
+            "data": {
+                "itinerary": final_state.get("itinerary", {}),
+                "trip_request": final_state.get("trip_request", {}),
+                "trip_strategy": final_state.get("trip_strategy", {}),
+            }
+        }
+    
+    # Check if slots are still incomplete (clarification needed)
+    if not final_state.get("slots_complete", False):
+        return {
+            "status": "clarifying",
+            "thread_id": thread_id,
+            "message": _get_latest_ai_message(final_state),
+            "data": {
+                "slots_collected": final_state.get("trip_request", {}),
+            }
+        }
+    
+    # Check if the trip was finalized
+    if final_state.get("trip_id"):
+        return {
+            "status": "complete",
+            "thread_id": thread_id,
+            "message": _get_latest_ai_message(final_state),
+            "data": {
+                "trip_id": final_state.get("trip_id", ""),
+                "itinerary_version_id": final_state.get("itinerary_version_id", ""),
+                "itinerary": final_state.get("itinerary", {}),
+                "trip_request": final_state.get("trip_request", {}),
+            }
+        }
+    
+    # Fallback: graph is still running or in an unknown state
+    return {
+        "status": "planning",
+        "thread_id": thread_id,
+        "message": _get_latest_ai_message(final_state),
+        "data": {
+            "trip_request": final_state.get("trip_request", {}),
+        }
+    }
+
+
 @router.post("/chat")
 async def chat(
     user_id: str = Body(..., description="User ID"),
@@ -157,146 +365,25 @@ async def chat(
     - "reviewing"  → draft itinerary ready for user review
     - "complete"   → trip finalized, itinerary ready
     """
-    
-    # Generate or use provided thread_id
-    if not thread_id:
-        thread_id = str(uuid.uuid4())
-        is_new_session = True
-    else:
-        is_new_session = False
-    
+    thread_id, is_new_session = _resolve_thread(thread_id)
     config = {"configurable": {"thread_id": thread_id}}
+    travel_graph = get_travel_graph()
     
     try:
-        if is_new_session:
-            # ── New session: Initialize and invoke the graph ──
-            initial_state = {
-                "user_id": user_id,
-                "user_preferences": {},
-                "messages": [{"role": "user", "content": message}],
-                "trip_request": {},
-                "slots_complete": False,
-                "clarification_count": 0,
-                "tool_plan": [],
-                "tool_results": {},
-                "trip_strategy": {},
-                "itinerary": {},
-                "review_status": "",
-                "review_feedback": "",
-                "trip_id": "",
-                "itinerary_version_id": "",
-                "current_node": "initializer"
-            }
-            
-            result = await travel_graph.ainvoke(initial_state, config=config)
-        else:
-            # ── Resume session: Check where the graph is paused ──
-            state_snapshot = await travel_graph.aget_state(config)
-            current_state = state_snapshot.values
-            next_nodes = state_snapshot.next  # tuple of next node names
-            
-            if next_nodes and "review" in next_nodes:
-                # Graph is paused before the REVIEW node
-                # User is responding to the draft itinerary
-                response_lower = message.strip().lower()
-                
-                if response_lower in ("approve", "yes", "looks good", "confirm", "ok", "lgtm", "perfect"):
-                    # User approved — update state and resume
-                    await travel_graph.aupdate_state(
-                        config,
-                        {
-                            "review_status": "approved",
-                            "review_feedback": "",
-                            "messages": [{"role": "user", "content": message}]
-                        }
-                    )
-                else:
-                    # User wants revision — update state with feedback and resume
-                    await travel_graph.aupdate_state(
-                        config,
-                        {
-                            "review_status": "revision_requested",
-                            "review_feedback": message,
-                            "messages": [{"role": "user", "content": message}]
-                        }
-                    )
-                
-                # Resume execution from the review node
-                result = await travel_graph.ainvoke(None, config=config)
-            
-            else:
-                # Graph ended after intent_slot (clarification needed)
-                # OR graph completed but user is sending a follow-up
-                
-                # Update the state with the new user message and re-run
-                await travel_graph.aupdate_state(
-                    config,
-                    {
-                        "messages": [{"role": "user", "content": message}],
-                    },
-                    as_node="initializer"  # Re-enter from initializer so it flows to intent_slot
-                )
-                
-                # Resume graph
-                result = await travel_graph.ainvoke(None, config=config)
-        
-        # ── Determine response based on final state ──
-        state_snapshot = await travel_graph.aget_state(config)
-        final_state = state_snapshot.values
-        next_nodes = state_snapshot.next
-        
-        # Check if graph is paused before review (draft ready)
-        if next_nodes and "review" in next_nodes:
-            return {
-                "status": "reviewing",
-                "thread_id": thread_id,
-                "message": (
-                    f"Here's your draft itinerary for "
-                    f"{final_state.get('trip_request', {}).get('destination', 'your trip')}! "
-                    f"Review it below and reply 'approve' to finalize, "
-                    f"or tell me what you'd like to change."
-                ),
-                "data": {
-                    "itinerary": final_state.get("itinerary", {}),
-                    "trip_request": final_state.get("trip_request", {}),
-                    "trip_strategy": final_state.get("trip_strategy", {}),
-                }
-            }
-        
-        # Check if slots are still incomplete (clarification needed)
-        if not final_state.get("slots_complete", False):
-            return {
-                "status": "clarifying",
-                "thread_id": thread_id,
-                "message": _get_latest_ai_message(final_state),
-                "data": {
-                    "slots_collected": final_state.get("trip_request", {}),
-                }
-            }
+        current_state = {} if is_new_session else await _load_thread_state(config)
+        if _is_acknowledgement(current_state, message):
+            current_state = await _record_acknowledgement(travel_graph, config, current_state, message)
+            return _json(_build_chat_response(thread_id, current_state))
         
-        # Check if the trip was finalized
-        if final_state.get("trip_id"):
-            return {
-                "status": "complete",
-                "thread_id": thread_id,
-                "message": _get_latest_ai_message(final_state),
-                "data": {
-                    "trip_id": final_state.get("trip_id", ""),
-                    "itinerary_version_id": final_state.get("itinerary_version_id", ""),
-                    "itinerary": final_state.get("itinerary", {}),
-                    "trip_request": final_state.get("trip_request", {}),
-                }
-            }
+        graph_input = await _prepare_graph_input(travel_graph, config, user_id, message, current_state)
+        # ainvoke returns the run's final state values, so no checkpoint re-read
+        # is needed (only if the run produced nothing)
+        final_state = await travel_graph.ainvoke(graph_input, config=config, durability=CHECKPOINT_DURABILITY)
         
-        # Fallback: graph is still running or in an unknown state
-        return {
-            "status": "planning",
-            "thread_id": thread_id,
-            "message": _get_latest_ai_message(final_state),
-            "data": {
-                "trip_request": final_state.get("trip_request", {}),
-            }
-        }
+        # ── Determine response based on final state ──
+        if not final_state:
+            final_state = await _load_thread_state(config)
+        return _json(_build_chat_response(thread_id, final_state))
         
     except Exception as e:
         raise HTTPException(
@@ -305,32 +392,98 @@ async def chat(
         )
 
 
+# Nodes whose LLM tokens are forwarded to the client by /chat/stream
+_STREAMED_NODES = frozenset({"itinerary_gen"})
+
+
+def _sse(event: str, data: dict) -> str:
+    """Format one Server-Sent Events frame."""
+    return f"event: {event}\ndata: {orjson.dumps(data, default=str).decode()}\n\n"
+
+
+@router.post("/chat/stream")
+async def chat_stream(
+    user_id: str = Body(..., description="User ID"),
+    message: str = Body(..., description="User's message"),
+    thread_id: str = Body(None, description="Thread ID for continuing a session (null for new)")
+):
+    """
+    Streaming variant of /chat, as Server-Sent Events.
+    
+    Events:
+    - "token"  → {"node", "text"}: raw itinerary output as Gemini generates it,
+                 so the client can show progress instead of waiting for the whole draft
+    - "result" → the same payload /chat returns, sent once the run finishes
+    - "error"  → {"detail"} if the run fails
+    """
+    thread_id, is_new_session = _resolve_thread(thread_id)
+    config = {"configurable": {"thread_id": thread_id}}
+    travel_graph = get_travel_graph()
+    
+    async def event_stream():
+        try:
+            current_state = {} if is_new_session else await _load_thread_state(config)
+            if _is_acknowledgement(current_state, message):
+                current_state = await _record_acknowledgement(travel_graph, config, current_state, message)
+                yield _sse("result", _build_chat_response(thread_id, current_state))
+                return
+            
+            graph_input = await _prepare_graph_input(travel_graph, config, user_id, message, current_state)
+            # "values" rides along so the last state snapshot doubles as the result
+            final_state = None
+            async for mode, payload in travel_graph.astream(
+                graph_input,
+                config=config,
+                stream_mode=["messages", "values"],
+                durability=CHECKPOINT_DURABILITY,
+            ):
+                if mode == "values":
+                    final_state = payload
+                    continue
+                chunk, metadata = payload
+                node = metadata.get("langgraph_node")
+                if node in _STREAMED_NODES and chunk.text:
+                    yield _sse("token", {"node": node, "text": chunk.text})
+            
+            if not final_state:
+                final_state = await _load_thread_state(config)
+            yield _sse("result", _build_chat_response(thread_id, final_state))
+        except Exception as e:
+            yield _sse("error", {"detail": f"Trip planning failed: {str(e)}"})
+    
+    return StreamingResponse(event_stream(), media_type="text/event-stream")
+
+
 # ── Read-only endpoints ──
 
+async def _valid_trip_id(trip_id: str) -> ObjectId:
+    """Parse the trip_id path param, rejecting malformed IDs before any query."""
+    if not ObjectId.is_valid(trip_id):
+        raise HTTPException(status_code=400, detail="Invalid trip ID")
+    return ObjectId(trip_id)
+
+
 @router.get("/{trip_id}")
-async def get_trip(trip_id: str):
+async def get_trip(trip_oid: ObjectId = Depends(_valid_trip_id)):
     """Get trip details by ID."""
     db = get_database()
     
-    try:
-        trip = await db.trips.find_one({"_id": ObjectId(trip_id)})
-    except Exception:
-        raise HTTPException(status_code=400, detail="Invalid trip ID")
+    trip = await db.trips.find_one({"_id": trip_oid})
     
     if not trip:
         raise HTTPException(status_code=404, detail="Trip not found")
     
     trip["_id"] = str(trip["_id"])
-    return trip
+    return _json(trip)
 
 
 @router.get("/{trip_id}/itinerary")
-async def get_trip_itinerary(trip_id: str):
+async def get_trip_itinerary(trip_oid: ObjectId = Depends(_valid_trip_id)):
     """Get the latest itinerary version for a trip."""
     db = get_database()
     
     version = await db.itinerary_versions.find_one(
-        {"trip_id": trip_id},
+        {"trip_id": str(trip_oid)},
         sort=[("version_number", -1)]
     )
     
@@ -338,13 +491,14 @@ async def get_trip_itinerary(trip_id: str):
         raise HTTPException(status_code=404, detail="No itinerary found for this trip")
     
     version["_id"] = str(version["_id"])
-    return version
+    return _json(version)
 
 
 @router.get("/{trip_id}/conversations")
-async def get_trip_conversations(trip_id: str):
+async def get_trip_conversations(trip_oid: ObjectId = Depends(_valid_trip_id)):
     """Get conversation history for a trip."""
     db = get_database()
+    trip_id = str(trip_oid)  # child documents store the trip ID as a string
     
     conversation = await db.conversations.find_one({"trip_id": trip_id})
     
@@ -352,4 +506,13 @@ async def get_trip_conversations(trip_id: str):
         raise HTTPException(status_code=404, detail="No conversation found for this trip")
     
     conversation["_id"] = str(conversation["_id"])
-    return conversation
+    
+    # Newer conversations keep one document per message; older ones embed them
+    if "messages" not in conversation:
+        cursor = db.conversation_messages.find(
+            {"trip_id": trip_id},
+            projection={"_id": 0, "role": 1, "content": 1, "timestamp": 1}
+        ).sort("seq", 1)
+        conversation["messages"] = await cursor.to_list(length=None)
+    
+    return _json(conversation)
@@ -1,12 +1,147 @@
+import asyncio
 from fastapi import APIRouter, Depends, Body, HTTPException, status
-from src.auth.dependencies import get_current_user
+from pydantic import BaseModel
+from src.auth.dependencies import get_current_user, reset_bypass_user
 from src.models.user import UserInDB, UserPreferences, UserResponse
+from src.config import settings
 from src.database import get_database
-from datetime import datetime
-from bson import ObjectId
+from src.agent.tools.cache import ainvalidate_user_prefs
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError, WriteError
 
 router = APIRouter()
 
+
+def _dotted_set_ops(prefix: str, patch: dict, current: BaseModel):
+    """Yield ($set path, value) pairs that apply `patch` on top of `current`.
+    
+    Recurses into sub-models that already exist on `current` (so sibling
+    fields survive); anything else, lists included, is replaced whole. None
+    values inside nested dicts are skipped rather than clearing the stored field.
+    `current` is read by attribute, so it never has to be dumped to a dict.
+    """
+    for key, value in patch.items():
+        existing = getattr(current, key, None)
+        if isinstance(value, dict) and isinstance(existing, BaseModel):
+            for path, nested in _dotted_set_ops(f"{prefix}.{key}", value, existing):
+                if nested is not None:
+                    yield path, nested
+        else:
+            yield f"{prefix}.{key}", value
+
+
+# ── Coalesced preference writes ──
+# Autosaving clients send bursts of PATCHes. A lone write goes out at once;
+# writes that arrive while one is in flight are merged per user and flushed
+# together after a short window: one bulk_write plus one read of the
+# resulting preferences, instead of a round-trip per request.
+
+_pending_prefs: dict = {}    # Mongo _id -> merged $set
+_pending_results: dict = {}  # Mongo _id -> Future resolved with the stored preferences
+_flush_task: asyncio.Task = None
+
+
+def _merge_set_ops(pending: dict, new: dict) -> None:
+    """Fold `new` $set paths into `pending`; later values win.
+    
+    Keeps the merged $set free of overlapping paths (Mongo rejects e.g.
+    "preferences.budget_range" together with "preferences.budget_range.max").
+    """
+    for path, value in new.items():
+        parent = next((p for p in pending if path.startswith(p + ".")), None)
+        if parent is not None:
+            # An earlier write set the whole parent object; update inside it
+            if not isinstance(pending[parent], dict):
+                pending[parent] = {}
+            target = pending[parent]
+            *keys, last = path[len(parent) + 1:].split(".")
+            for key in keys:
+                if not isinstance(target.get(key), dict):
+                    target[key] = {}
+                target = target[key]
+            target[last] = value
+            continue
+        
+        for child in [p for p in pending if p.startswith(path + ".")]:
+            del pending[child]
+        pending[path] = value
+
+
+def _retrieve_exception(future: asyncio.Future) -> None:
+    """Mark a failed write as seen, so asyncio doesn't log it if every waiter left."""
+    if not future.cancelled():
+        future.exception()
+
+
+async def _run_prefs_writes(pending: dict, results: dict) -> None:
+    """Write one batch of queued updates and resolve each user's waiters."""
+    user_ids = list(pending)
+    failed = {}  # Mongo _id -> WriteError for that user's update only
+    db = get_database()
+    try:
+        await db.users.bulk_write(
+            [
+                # The server stamps updated_at, so app-node clock skew can't reorder writes
+                UpdateOne({"_id": user_id}, {"$set": pending[user_id], "$currentDate": {"updated_at": True}})
+                for user_id in user_ids
+            ],
+            ordered=False,
+        )
+    except BulkWriteError as e:
+        # Unordered, so the other updates still applied
+        for error in e.details.get("writeErrors", []):
+            failed[user_ids[error["index"]]] = WriteError(error.get("errmsg"), error.get("code"), error)
+    except Exception as e:
+        for future in results.values():
+            future.set_exception(e)
+        return
+    
+    try:
+        written = [user_id for user_id in user_ids if user_id not in failed]
+        cursor = db.users.find({"_id": {"$in": written}}, projection={"preferences": 1})
+        stored = {doc["_id"]: doc.get("preferences") or {} for doc in await cursor.to_list()}
+    except Exception as e:
+        stored = None
+        read_error = e
+    
+    for user_id, future in results.items():
+        if user_id in failed:
+            future.set_exception(failed[user_id])
+        elif stored is None:
+            future.set_exception(read_error)
+        else:
+            future.set_result(stored.get(user_id))
+
+
+async def _flush_prefs_writes():
+    """Write queued updates until the queue stays empty."""
+    global _pending_prefs, _pending_results, _flush_task
+    try:
+        while _pending_prefs:
+            pending, results = _pending_prefs, _pending_results
+            _pending_prefs, _pending_results = {}, {}
+            await _run_prefs_writes(pending, results)
+            if _pending_prefs:
+                # More arrived mid-write — a burst, so let it fill the window
+                await asyncio.sleep(settings.PREFS_WRITE_WINDOW_MS / 1000)
+    finally:
+        _flush_task = None
+
+
+async def _write_prefs(user_id, set_ops: dict):
+    """Queue a preferences $set; returns the stored preferences (None if no such user)."""
+    global _flush_task
+    _merge_set_ops(_pending_prefs.setdefault(user_id, {}), set_ops)
+    if user_id not in _pending_results:
+        _pending_results[user_id] = asyncio.get_running_loop().create_future()
+        _pending_results[user_id].add_done_callback(_retrieve_exception)
+    future = _pending_results[user_id]
+    if _flush_task is None:
+        _flush_task = asyncio.create_task(_flush_prefs_writes())
+    # Shielded: one cancelled request mustn't cancel the result other waiters share
+    return await asyncio.shield(future)
+
+
 @router.get("/me", response_model=UserResponse)
 async def read_users_me(current_user: UserInDB = Depends(get_current_user)):
     return current_user
@@ -20,73 +155,25 @@ async def update_user_preferences(
     preferences: UserPreferences = Body(...),
     current_user: UserInDB = Depends(get_current_user)
 ):
-    db = get_database()
-    
-    # Get current preferences as a dict
-    current_prefs_dict = current_user.preferences.dict() if current_user.preferences else {}
+    # One $set of dotted paths updates just the sent fields server-side — no
+    # read-modify-write of the whole preferences subdocument
+    if current_user.preferences is None:
+        set_ops = {"preferences": preferences.model_dump()}
+    else:
+        # Only the fields the user actually sent, already validated by the body model
+        patch = preferences.model_dump(exclude_unset=True)
+        set_ops = dict(_dotted_set_ops("preferences", patch, current_user.preferences))
     
-    # Get only the fields the user actually sent (exclude_unset=True)
-    new_prefs_dict = preferences.dict(exclude_unset=True)
-    
-    # Convert nested Pydantic models (like BudgetRange) to dicts properly
-    # exclude_unset doesn't recurse into nested models, so BudgetRange 
-    # may include None defaults. Clean those out.
-    def clean_none_in_nested(d):
-        """Remove None values from nested dicts (handles BudgetRange, etc.)."""
-        cleaned = {}
-        for k, v in d.items():
-            if isinstance(v, dict):
-                nested = {nk: nv for nk, nv in v.items() if nv is not None}
-                if nested:  # only include if there's at least one non-None value
-                    cleaned[k] = nested
-            else:
-                cleaned[k] = v
-        return cleaned
-    
-    new_prefs_dict = clean_none_in_nested(new_prefs_dict)
-    
-    # Deep merge: new values overwrite current, nested dicts are merged
-    def deep_update(original, update):
-        for key, value in update.items():
-            if isinstance(value, dict) and key in original and isinstance(original[key], dict):
-                deep_update(original[key], value)
-            else:
-                original[key] = value
-        return original
-    
-    updated_prefs_dict = deep_update(current_prefs_dict, new_prefs_dict)
-    
-    # Validate through Pydantic
-    validated_prefs = UserPreferences(**updated_prefs_dict)
-    
-    # Build MongoDB filter — handle both string and ObjectId
+    # PyObjectId keeps the id as an ObjectId, so it filters on _id as-is
     user_id = current_user.id
-    try:
-        filter_id = ObjectId(user_id)
-    except Exception:
-        filter_id = user_id
     
-    result = await db.users.update_one(
-        {"_id": filter_id},
-        {
-            "$set": {
-                "preferences": validated_prefs.dict(),
-                "updated_at": datetime.utcnow()
-            }
-        }
-    )
+    stored_prefs = await _write_prefs(user_id, set_ops)
+    if stored_prefs is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
     
-    if result.modified_count == 0:
-        # Might be a string vs ObjectId mismatch — try the other form
-        alt_id = str(user_id) if isinstance(filter_id, ObjectId) else user_id
-        await db.users.update_one(
-            {"_id": alt_id},
-            {
-                "$set": {
-                    "preferences": validated_prefs.dict(),
-                    "updated_at": datetime.utcnow()
-                }
-            }
-        )
+    # The agent initializer reads preferences through Redis — drop the stale copy
+    await ainvalidate_user_prefs(str(user_id))
+    reset_bypass_user()
     
-    return validated_prefs
+    # response_model validates the stored preferences on the way out
+    return stored_prefs
@@ -1,3 +1,4 @@
+import time
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from jose import jwt, JWTError
@@ -8,13 +9,37 @@ from bson import ObjectId
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/login", auto_error=False)
 
+# The current user never needs the bcrypt hash; don't ship it from Mongo
+_CURRENT_USER_PROJECTION = {"password_hash": 0}
+
+# Bypass mode serves one user for every request; keep it in memory
+# and re-read it now and then so edits made elsewhere show up
+BYPASS_USER_TTL_SECONDS = 60
+_bypass_user: UserInDB = None
+_bypass_user_loaded_at: float = 0.0
+
+async def load_bypass_user() -> UserInDB:
+    """(Re)load the bypass-mode user from Mongo. Called at startup and on expiry."""
+    global _bypass_user, _bypass_user_loaded_at
+    db = get_database()
+    user = await db.users.find_one({}, _CURRENT_USER_PROJECTION)
+    _bypass_user = UserInDB(**user) if user else None
+    _bypass_user_loaded_at = time.monotonic()
+    return _bypass_user
+
+def reset_bypass_user() -> None:
+    """Forget the in-memory bypass user (after it was modified)."""
+    global _bypass_user
+    _bypass_user = None
+
 async def get_current_user(token: str = Depends(oauth2_scheme)) -> UserInDB:
     # TEMPORARY: Bypass authentication for testing
-    db = get_database()
-    user = await db.users.find_one({})
+    user = _bypass_user
+    if user is None or time.monotonic() - _bypass_user_loaded_at > BYPASS_USER_TTL_SECONDS:
+        user = await load_bypass_user()
     if user:
-        return UserInDB(**user)
-        
+        return user
+    
     # Original Auth Logic (Commented Out)
     # credentials_exception = HTTPException(
     #     status_code=status.HTTP_401_UNAUTHORIZED,
@@ -30,7 +55,7 @@ async def get_current_user(token: str = Depends(oauth2_scheme)) -> UserInDB:
     #     raise credentials_exception
     
     # db = get_database()
-    # user = await db.users.find_one({"_id": ObjectId(user_id)})
+    # user = await db.users.find_one({"_id": ObjectId(user_id)}, _CURRENT_USER_PROJECTION)
     # if user is None:
     #     raise credentials_exception
         
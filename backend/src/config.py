@@ -9,17 +9,32 @@ class Settings(BaseSettings):
     PROJECT_NAME: str = "Voyage AI Backend"
     MONGO_URI: str = os.getenv("MONGO_URI")
     DB_NAME: str = "voyage_ai"
+    MONGO_MIN_POOL_SIZE: int = 10  # opened at startup so first requests skip the handshake
+    MONGO_MAX_POOL_SIZE: int = 50
+    MONGO_MAX_IDLE_TIME_MS: int = 60_000
+    MONGO_SERVER_SELECTION_TIMEOUT_MS: int = 3_000
     REDIS_URL: str = os.getenv("REDIS_URL")
+    REDIS_MAX_CONNECTIONS: int = 100
+    REDIS_POOL_TIMEOUT_SECONDS: int = 5  # max wait for a free pooled connection
+    REDIS_HEALTH_CHECK_INTERVAL_SECONDS: int = 30  # PING connections idle longer than this before reuse
+    CHECKPOINT_TTL_MINUTES: int = 24 * 60  # idle planning sessions expire after a day
+
+    # Worker threads for blocking work (FastAPI sync deps, asyncio.to_thread, sync graph nodes)
+    THREADPOOL_SIZE: int = 64
     
     SECRET_KEY: str = "supersecretkey" # Change in production
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
+    # Preference PATCHes that arrive while a write is in flight wait this long, then go to Mongo together
+    PREFS_WRITE_WINDOW_MS: int = 50
 
     GOOGLE_API_KEY: str = os.getenv("GOOGLE_API_KEY", "")
     LLM_MODEL: str = "gemini-2.5-flash"
 
     AMADEUS_API_KEY: str = os.getenv("AMADEUS_API_KEY", "")
     AMADEUS_API_SECRET: str = os.getenv("AMADEUS_API_SECRET", "")
+    # Test environment by default (as the Amadeus SDK was); https://api.amadeus.com for production
+    AMADEUS_BASE_URL: str = os.getenv("AMADEUS_BASE_URL", "https://test.api.amadeus.com")
 
     class Config:
         env_file = ".env"
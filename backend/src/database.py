@@ -1,27 +1,60 @@
-from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import AsyncMongoClient
+from pymongo.errors import OperationFailure
 import redis.asyncio as redis
 from src.config import settings
 
 class Database:
-    client: AsyncIOMotorClient = None
+    client: AsyncMongoClient = None
     redis_client: redis.Redis = None
+    # Same server, raw bytes in and out — for binary (MessagePack) payloads
+    redis_binary_client: redis.Redis = None
 
 db = Database()
 
 async def connect_to_mongo():
-    db.client = AsyncIOMotorClient(settings.MONGO_URI)
+    # PyMongo's native asyncio client — no thread-pool hop per operation as with Motor
+    db.client = AsyncMongoClient(
+        settings.MONGO_URI,
+        minPoolSize=settings.MONGO_MIN_POOL_SIZE,
+        maxPoolSize=settings.MONGO_MAX_POOL_SIZE,
+        maxIdleTimeMS=settings.MONGO_MAX_IDLE_TIME_MS,
+        serverSelectionTimeoutMS=settings.MONGO_SERVER_SELECTION_TIMEOUT_MS,
+    )
+    # Connects now (and starts filling the pool up to minPoolSize) instead of
+    # on the first request
+    await db.client.admin.command("ping")
     print(f"Connected to MongoDB at {settings.MONGO_URI}")
 
 async def close_mongo_connection():
     if db.client:
-        db.client.close()
+        await db.client.close()
         print("Closed MongoDB connection")
 
 async def connect_to_redis():
-    db.redis_client = redis.from_url(settings.REDIS_URL, encoding="utf-8", decode_responses=True)
+    # One shared, bounded pool: under load callers wait for a free connection
+    # instead of opening an unbounded number of sockets to Redis
+    pool = redis.BlockingConnectionPool.from_url(
+        settings.REDIS_URL,
+        max_connections=settings.REDIS_MAX_CONNECTIONS,
+        timeout=settings.REDIS_POOL_TIMEOUT_SECONDS,
+        health_check_interval=settings.REDIS_HEALTH_CHECK_INTERVAL_SECONDS,
+        encoding="utf-8",
+        decode_responses=True,
+    )
+    db.redis_client = redis.Redis.from_pool(pool)
+    # decode_responses is per connection, so binary values need their own pool
+    binary_pool = redis.BlockingConnectionPool.from_url(
+        settings.REDIS_URL,
+        max_connections=settings.REDIS_MAX_CONNECTIONS,
+        timeout=settings.REDIS_POOL_TIMEOUT_SECONDS,
+        health_check_interval=settings.REDIS_HEALTH_CHECK_INTERVAL_SECONDS,
+    )
+    db.redis_binary_client = redis.Redis.from_pool(binary_pool)
     print(f"Connected to Redis at {settings.REDIS_URL}")
 
 async def close_redis_connection():
+    if db.redis_binary_client:
+        await db.redis_binary_client.close()
     if db.redis_client:
         await db.redis_client.close()
         print("Closed Redis connection")
@@ -29,5 +62,78 @@ async def close_redis_connection():
 def get_database():
     return db.client[settings.DB_NAME]
 
+async def create_indexes():
+    """Create the MongoDB indexes the app relies on. Idempotent."""
+    database = get_database()
+    # Trip listings scan by user, newest first (optionally filtered by status)
+    await database.trips.create_index([("user_id", 1), ("created_at", -1)])
+    await database.trips.create_index([("user_id", 1), ("status", 1), ("created_at", -1)])
+    await database.itinerary_versions.create_index([("trip_id", 1), ("version_number", -1)])
+    await database.itinerary_versions.create_index([("trip_id", 1), ("created_at", -1)])
+    await database.itinerary_versions.create_index([("user_id", 1), ("created_at", -1)])
+    await database.conversations.create_index("trip_id")
+    await database.conversation_messages.create_index([("trip_id", 1), ("seq", 1)])
+    # Login and registration look users up by email
+    try:
+        await database.users.create_index("email", unique=True)
+    except OperationFailure as e:
+        # Legacy duplicate emails block the unique index; report them and
+        # keep serving (registration still checks for an existing email)
+        cursor = await database.users.aggregate([
+            {"$group": {"_id": "$email", "count": {"$sum": 1}}},
+            {"$match": {"count": {"$gt": 1}}},
+        ])
+        duplicates = [doc["_id"] for doc in await cursor.to_list()]
+        print(f"Could not create unique users.email index ({e}); duplicate emails: {duplicates}")
+
+# Completed one-off data migrations, by name (see _run_migration_once)
+MIGRATIONS_COLLECTION = "migrations"
+
+async def _run_migration_once(name: str, migrate) -> None:
+    """Run `migrate()` unless a completion marker for `name` is recorded.
+    
+    Startup only pays one indexed _id lookup once the migration has run.
+    Workers starting together may each run it, so migrations must be idempotent.
+    """
+    migrations = get_database()[MIGRATIONS_COLLECTION]
+    if await migrations.find_one({"_id": name}, projection={"_id": 1}):
+        return
+    await migrate()
+    await migrations.update_one(
+        {"_id": name}, {"$currentDate": {"completed_at": True}}, upsert=True
+    )
+
+async def _copy_trip_user_ids():
+    """The $lookup + $merge pass behind backfill_itinerary_user_ids."""
+    database = get_database()
+    pipeline = [
+        {"$match": {"user_id": {"$exists": False}}},
+        {"$lookup": {
+            "from": "trips",
+            "let": {"trip_id": {"$convert": {"input": "$trip_id", "to": "objectId", "onError": None}}},
+            "pipeline": [
+                {"$match": {"$expr": {"$eq": ["$_id", "$$trip_id"]}}},
+                {"$project": {"_id": 0, "user_id": 1}},
+            ],
+            "as": "trip",
+        }},
+        {"$unwind": "$trip"},
+        {"$project": {"user_id": "$trip.user_id"}},
+        {"$merge": {"into": "itinerary_versions", "on": "_id", "whenMatched": "merge", "whenNotMatched": "discard"}},
+    ]
+    cursor = await database.itinerary_versions.aggregate(pipeline)
+    await cursor.to_list()
+
+async def backfill_itinerary_user_ids():
+    """Copy user_id from the parent trip onto itinerary versions saved without it.
+    
+    One server-side pass ($lookup + $merge), run once per database: the
+    finalizer writes user_id on every new version, so later startups skip it.
+    """
+    await _run_migration_once("itinerary_versions.user_id", _copy_trip_user_ids)
+
 def get_redis_client():
     return db.redis_client
+
+def get_redis_binary_client():
+    return db.redis_binary_client
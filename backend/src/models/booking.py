@@ -1,4 +1,4 @@
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 from typing import Optional, List, Dict
 from datetime import datetime
 from src.models.user import PyObjectId
@@ -24,15 +24,10 @@ class ActivityLink(BaseModel):
 
 class BookingLinks(BaseModel):
     id: Optional[PyObjectId] = Field(alias="_id", default=None)
-    trip_id: PyObjectId
+    trip_id: str
     itinerary_version: int
     flights: List[FlightLink] = []
     hotels: List[HotelLink] = []
     activities: List[ActivityLink] = []
 
-    class Config:
-        populate_by_name = True
-        arbitrary_types_allowed = True
-        json_encoders = {
-            datetime: lambda v: v.isoformat()
-        }
+    model_config = ConfigDict(populate_by_name=True, arbitrary_types_allowed=True)
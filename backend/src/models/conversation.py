@@ -1,4 +1,4 @@
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 from typing import Optional, List, Dict
 from datetime import datetime
 from src.models.user import PyObjectId
@@ -17,14 +17,9 @@ class Message(BaseModel):
 
 class Conversation(BaseModel):
     id: Optional[PyObjectId] = Field(alias="_id", default=None)
-    trip_id: Optional[PyObjectId] = None
-    user_id: PyObjectId
+    trip_id: Optional[str] = None
+    user_id: str
     created_at: datetime = Field(default_factory=datetime.utcnow)
     messages: List[Message] = []
 
-    class Config:
-        populate_by_name = True
-        arbitrary_types_allowed = True
-        json_encoders = {
-            datetime: lambda v: v.isoformat()
-        }
+    model_config = ConfigDict(populate_by_name=True, arbitrary_types_allowed=True)
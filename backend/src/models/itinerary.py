@@ -1,4 +1,4 @@
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 from typing import Optional, List
 from datetime import datetime, date
 from src.models.user import PyObjectId
@@ -29,17 +29,12 @@ class ItineraryDetail(BaseModel):
 
 class ItineraryVersion(BaseModel):
     id: Optional[PyObjectId] = Field(alias="_id", default=None)
-    trip_id: PyObjectId
+    trip_id: str  # stored as a string by the finalizer
+    user_id: Optional[str] = None  # denormalized from the trip (stored as a str), for per-user listings
     version_number: int
     created_at: datetime = Field(default_factory=datetime.utcnow)
     created_by: str # "ai | user"
     change_summary: Optional[str] = None
     itinerary: ItineraryDetail
 
-    class Config:
-        populate_by_name = True
-        arbitrary_types_allowed = True
-        json_encoders = {
-            datetime: lambda v: v.isoformat(),
-            date: lambda v: v.isoformat()
-        }
+    model_config = ConfigDict(populate_by_name=True, arbitrary_types_allowed=True)
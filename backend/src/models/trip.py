@@ -1,4 +1,4 @@
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 from typing import Optional, List
 from datetime import datetime, date
 from src.models.user import PyObjectId
@@ -15,7 +15,7 @@ class TripConstraints(BaseModel):
 
 class Trip(BaseModel):
     id: Optional[PyObjectId] = Field(alias="_id", default=None)
-    user_id: PyObjectId
+    user_id: str  # stored as a string by the finalizer
     title: str
     status: str # "planning | finalized | cancelled"
     created_at: datetime = Field(default_factory=datetime.utcnow)
@@ -24,10 +24,4 @@ class Trip(BaseModel):
     current_version: int = 1
     final_itinerary_version: Optional[int] = None
 
-    class Config:
-        populate_by_name = True
-        arbitrary_types_allowed = True
-        json_encoders = {
-            datetime: lambda v: v.isoformat(),
-            date: lambda v: v.isoformat()
-        }
+    model_config = ConfigDict(populate_by_name=True, arbitrary_types_allowed=True)
@@ -1,9 +1,23 @@
-from pydantic import BaseModel, EmailStr, Field, BeforeValidator
+from pydantic import BaseModel, ConfigDict, EmailStr, Field, PlainValidator, PlainSerializer, WithJsonSchema
 from typing import Optional, List, Annotated
 from datetime import datetime
+from bson import ObjectId
 
-# Helper for ObjectId
-PyObjectId = Annotated[str, BeforeValidator(str)]
+def _to_object_id(value) -> ObjectId:
+    if isinstance(value, ObjectId):
+        return value
+    if isinstance(value, str) and ObjectId.is_valid(value):
+        return ObjectId(value)
+    raise ValueError(f"Invalid ObjectId: {value!r}")
+
+# Helper for ObjectId: held as a real ObjectId (ready for Mongo queries),
+# accepted as ObjectId or 24-hex string, and written as a string in JSON only
+PyObjectId = Annotated[
+    ObjectId,
+    PlainValidator(_to_object_id),
+    PlainSerializer(str, return_type=str, when_used="json"),
+    WithJsonSchema({"type": "string"}),
+]
 
 class BudgetRange(BaseModel):
     min: Optional[float] = None
@@ -33,18 +47,13 @@ class UserCreate(UserBase):
 
 class UserInDB(UserBase):
     id: Optional[PyObjectId] = Field(alias="_id", default=None)
-    password_hash: str
+    password_hash: Optional[str] = None  # left out when loading the current user
     created_at: datetime = Field(default_factory=datetime.utcnow)
     updated_at: datetime = Field(default_factory=datetime.utcnow)
     preferences: Optional[UserPreferences] = Field(default_factory=UserPreferences)
     metadata: Optional[UserMetadata] = Field(default_factory=UserMetadata)
 
-    class Config:
-        populate_by_name = True
-        arbitrary_types_allowed = True
-        json_encoders = {
-            datetime: lambda v: v.isoformat()
-        }
+    model_config = ConfigDict(populate_by_name=True, arbitrary_types_allowed=True)
 
 class UserResponse(UserBase):
     id: Optional[PyObjectId] = Field(alias="_id", default=None)
@@ -53,5 +62,4 @@ class UserResponse(UserBase):
     preferences: Optional[UserPreferences] = None
     metadata: Optional[UserMetadata] = None
 
-    class Config:
-        populate_by_name = True
+    model_config = ConfigDict(populate_by_name=True)
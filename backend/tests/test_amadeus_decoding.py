@@ -0,0 +1,64 @@
+"""Amadeus responses with missing fields still decode (one bad entry mustn't sink a search).
+
+Run from backend/: python -m unittest discover tests
+"""
+
+import os
+import unittest
+from unittest import mock
+
+os.environ.setdefault("MONGO_URI", "mongodb://localhost")
+os.environ.setdefault("REDIS_URL", "redis://localhost")
+
+import orjson
+from src.agent.tools import flights, hotels
+
+
+def _fake_get(payloads: dict):
+    """amadeus_get stand-in that decodes canned payloads by path."""
+    async def amadeus_get(path, params, decoder=None):
+        return decoder.decode(orjson.dumps(payloads[path])).data
+    return amadeus_get
+
+
+class PartialFlightOffersTest(unittest.IsolatedAsyncioTestCase):
+    async def test_segment_without_iata_code(self):
+        payload = {"data": [{
+            "id": "1",
+            "price": {"grandTotal": "512.40", "currency": "USD"},
+            "itineraries": [{"segments": [
+                {"departure": {"at": "2026-11-02T09:00"}, "arrival": {"iataCode": "NRT"}, "carrierCode": "NH"},
+            ]}],
+        }]}
+        with mock.patch.object(flights, "amadeus_get", _fake_get({"/v2/shopping/flight-offers": payload})):
+            result = await flights.afetch_flights("JFK", "TYO", "2026-11-02")
+        
+        self.assertNotIn("error", result)
+        segment = result["flights"][0]["itineraries"][0]["segments"][0]
+        self.assertEqual(segment["departure_airport"], "")
+        self.assertEqual(segment["arrival_airport"], "NRT")
+
+
+class PartialHotelListTest(unittest.IsolatedAsyncioTestCase):
+    async def test_hotel_without_id_is_skipped(self):
+        payloads = {
+            "/v1/reference-data/locations/hotels/by-city": {"data": [{"name": "No ID"}, {"hotelId": "TYHOT1"}]},
+            "/v3/shopping/hotel-offers": {"data": [{"hotel": {"hotelId": "TYHOT1", "name": "Hotel One"}, "offers": []}]},
+        }
+        calls = []
+        fake_get = _fake_get(payloads)
+        
+        async def amadeus_get(path, params, decoder=None):
+            calls.append(params)
+            return await fake_get(path, params, decoder)
+        
+        with mock.patch.object(hotels, "amadeus_get", amadeus_get):
+            result = await hotels.afetch_hotels("TYO")
+        
+        self.assertNotIn("error", result)
+        self.assertEqual(calls[1]["hotelIds"], "TYHOT1")
+        self.assertEqual(result["hotels"][0]["name"], "Hotel One")
+
+
+if __name__ == "__main__":
+    unittest.main()
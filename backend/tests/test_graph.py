@@ -0,0 +1,116 @@
+"""Follow-up messages on a finalized trip, run through the compiled graph.
+
+Run from backend/: python -m unittest discover tests
+"""
+
+import os
+import unittest
+from unittest import mock
+
+os.environ.setdefault("MONGO_URI", "mongodb://localhost")
+os.environ.setdefault("REDIS_URL", "redis://localhost")
+
+import orjson
+from langchain_core.messages import AIMessage
+from src.agent import graph
+from src.agent.nodes import intent_slot
+from src.api.trips import _is_acknowledgement, _prepare_graph_input
+
+_TRIP_REQUEST = {
+    "destination": "Tokyo",
+    "destination_iata": "TYO",
+    "origin": "New York",
+    "origin_iata": "JFK",
+    "duration_days": 5,
+    "start_date": "2026-11-02",
+    "end_date": "2026-11-06",
+    "budget_max": 3000,
+    "travel_group": "couple",
+    "traveler_count": 2,
+}
+
+
+class _SlotLLM:
+    """Stands in for Gemini in intent_slot; records the user messages it sees."""
+    
+    def __init__(self, reply: dict):
+        self.reply = reply
+        self.seen = []
+    
+    async def ainvoke(self, messages):
+        self.seen.append(messages[-1].content)
+        return AIMessage(content=orjson.dumps(self.reply).decode())
+
+
+async def _planner(state):
+    return {"current_node": "itinerary_gen"}
+
+
+async def _itinerary_gen(state):
+    return {"current_node": "review"}
+
+
+_NEW_TRIP_ID = "6710c2f0a1b2c3d4e5f60719"
+
+
+async def _finalizer(state):
+    return {"trip_id": _NEW_TRIP_ID, "current_node": "done"}
+
+
+class FinalizedFollowUpTest(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        # Stub the nodes after intent_slot; the run pauses after itinerary_gen
+        with mock.patch.object(graph, "planner_node", _planner), \
+                mock.patch.object(graph, "itinerary_gen_node", _itinerary_gen), \
+                mock.patch.object(graph, "finalizer_node", _finalizer):
+            self.graph = graph.build_travel_graph()
+        self.config = {"configurable": {"thread_id": "finalized"}}
+        await self.graph.aupdate_state(
+            self.config,
+            {
+                "user_id": "",
+                "messages": [{"role": "ai", "content": "Your trip has been saved!"}],
+                "trip_request": _TRIP_REQUEST,
+                "slots_complete": True,
+                "clarification_count": 1,
+                "trip_id": "6710c2f0a1b2c3d4e5f60718",
+                "current_node": "done",
+            },
+            as_node="finalizer",
+        )
+    
+    async def _send(self, message: str, llm: _SlotLLM) -> dict:
+        state = (await self.graph.aget_state(self.config)).values
+        self.assertFalse(_is_acknowledgement(state, message))
+        graph_input = await _prepare_graph_input(self.graph, self.config, "", message, state)
+        with mock.patch.object(intent_slot, "_get_llm", return_value=llm):
+            return await self.graph.ainvoke(graph_input, config=self.config)
+    
+    async def test_edit_request_reaches_slot_filling(self):
+        # No number, date or slot keyword — must still be read by the LLM
+        llm = _SlotLLM({"budget_max": 1500, "is_complete": True})
+        final_state = await self._send("Make it cheaper", llm)
+        
+        self.assertEqual(llm.seen, ["Make it cheaper"])
+        self.assertEqual(final_state["trip_request"]["budget_max"], 1500)
+        self.assertEqual(final_state["current_node"], "review")
+    
+    async def test_new_destination_reaches_slot_filling(self):
+        llm = _SlotLLM({"destination": "Bali", "destination_iata": "DPS", "is_complete": True})
+        final_state = await self._send("How about Bali?", llm)
+        
+        self.assertEqual(llm.seen, ["How about Bali?"])
+        self.assertEqual(final_state["trip_request"]["destination"], "Bali")
+    
+    async def test_ok_on_revised_draft_approves_it(self):
+        # The revised draft awaits review while the old trip_id is still set
+        await self._send("Make it cheaper", _SlotLLM({"budget_max": 1500, "is_complete": True}))
+        
+        final_state = await self._send("ok", _SlotLLM({}))
+        
+        self.assertEqual(final_state["review_status"], "approved")
+        self.assertEqual(final_state["trip_id"], _NEW_TRIP_ID)
+
+
+if __name__ == "__main__":
+    unittest.main()
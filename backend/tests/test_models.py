@@ -0,0 +1,118 @@
+"""The document models validate what the app actually stores in Mongo.
+
+Run from backend/: python -m unittest discover tests
+"""
+
+import os
+import unittest
+from unittest import mock
+
+os.environ.setdefault("MONGO_URI", "mongodb://localhost")
+os.environ.setdefault("REDIS_URL", "redis://localhost")
+
+from bson import ObjectId
+from src.agent.nodes import finalizer
+from src.models.conversation import Conversation
+from src.models.itinerary import ItineraryVersion
+from src.models.trip import Trip
+from src.models.user import UserInDB, UserResponse
+
+
+class _Collection:
+    """Records inserted documents and assigns _id the way Mongo does."""
+    
+    def __init__(self):
+        self.docs = []
+    
+    def with_options(self, **kwargs):
+        return self
+    
+    async def insert_one(self, doc):
+        doc["_id"] = ObjectId()
+        self.docs.append(doc)
+        return mock.Mock(inserted_id=doc["_id"])
+    
+    async def insert_many(self, docs, ordered=True):
+        for doc in docs:
+            await self.insert_one(doc)
+
+
+class _Database:
+    def __init__(self):
+        self.trips = _Collection()
+        self.itinerary_versions = _Collection()
+        self.conversations = _Collection()
+        self.conversation_messages = _Collection()
+
+
+_FINALIZED_STATE = {
+    "user_id": str(ObjectId()),
+    "trip_request": {
+        "destination": "Tokyo",
+        "start_date": "2026-11-02",
+        "end_date": "2026-11-06",
+        "duration_days": 5,
+        "budget_max": 3000,
+        "travel_group": "couple",
+        "traveler_count": 2,
+    },
+    "itinerary": {
+        "title": "Autumn in Tokyo",
+        "total_cost_estimate": 2450.0,
+        "currency": "USD",
+        "days": [{
+            "day_number": 1,
+            "date": "2026-11-02",
+            "activities": [{
+                "time": "09:00",
+                "title": "Senso-ji",
+                "location_name": "Senso-ji Temple",
+                "latitude": 35.7148,
+                "longitude": 139.7967,
+                "cost_estimate": 0,
+                "tags": ["culture"],
+            }],
+        }],
+    },
+    "messages": [
+        {"role": "user", "content": "Plan a trip to Tokyo"},
+        {"role": "ai", "content": "Here's your draft itinerary"},
+    ],
+}
+
+
+class FinalizedDocumentsTest(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.db = _Database()
+        with mock.patch.object(finalizer, "get_database", return_value=self.db):
+            await finalizer.finalizer_node(_FINALIZED_STATE)
+    
+    def test_trip(self):
+        trip = Trip(**self.db.trips.docs[0])
+        self.assertIsInstance(trip.id, ObjectId)
+        self.assertEqual(trip.user_id, _FINALIZED_STATE["user_id"])
+    
+    def test_itinerary_version(self):
+        version = ItineraryVersion(**self.db.itinerary_versions.docs[0])
+        self.assertEqual(version.trip_id, str(self.db.trips.docs[0]["_id"]))
+        self.assertEqual(version.user_id, _FINALIZED_STATE["user_id"])
+    
+    def test_conversation(self):
+        conversation = Conversation(**self.db.conversations.docs[0])
+        self.assertEqual(conversation.trip_id, str(self.db.trips.docs[0]["_id"]))
+
+
+class UserDocumentTest(unittest.TestCase):
+    def test_stored_user_round_trip(self):
+        stored = UserInDB(email="ana@example.com", password_hash="x").model_dump(by_alias=True, exclude={"id"})
+        stored["_id"] = ObjectId()
+        
+        user = UserInDB(**stored)
+        self.assertEqual(user.id, stored["_id"])
+        # JSON (API responses, the Redis user cache) carries the id as a string
+        self.assertEqual(UserInDB.model_validate_json(user.model_dump_json(by_alias=True)).id, stored["_id"])
+        self.assertEqual(UserResponse(**stored).model_dump(mode="json")["id"], str(stored["_id"]))
+
+
+if __name__ == "__main__":
+    unittest.main()